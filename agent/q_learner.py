@@ -2,10 +2,31 @@
 from __future__ import annotations
 
 import json
+import os
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:  # Optional dependency for fast policy serialization
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    orjson = None  # type: ignore
+
+
+def write_policy(payload: Dict[str, Any], path: Path) -> None:
+    """Atomically write a :meth:`QLearner.snapshot` payload to ``path``.
+
+    Safe to call from a worker thread: the payload is an independent copy.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, indent=2).encode("utf-8")
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
 
 
 @dataclass
@@ -35,17 +56,23 @@ class QLearner:
         learner.epsilon_decay = data.get("epsilon_decay", learner.epsilon_decay)
         return learner
 
-    def save(self, path: Path) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        payload = {
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the persisted payload with the Q-table copied.
+
+        Later updates do not touch the snapshot, so it can be written from
+        another thread while learning continues.
+        """
+        return {
             "alpha": self.alpha,
             "gamma": self.gamma,
             "epsilon": self.epsilon,
             "epsilon_end": self.epsilon_end,
             "epsilon_decay": self.epsilon_decay,
-            "q_table": self.q_table,
+            "q_table": {state: dict(values) for state, values in self.q_table.items()},
         }
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    def save(self, path: Path) -> None:
+        write_policy(self.snapshot(), path)
 
     def select_action(self, state: str, legal_actions: List[str]) -> str:
         if not legal_actions:
@@ -70,3 +97,34 @@ class QLearner:
             self.epsilon *= self.epsilon_decay
             if self.epsilon < self.epsilon_end:
                 self.epsilon = self.epsilon_end
+
+    def update_batch(
+        self,
+        transitions: Iterable[Tuple[str, str, float, str]],
+        legal_actions: List[str],
+    ) -> None:
+        """Apply ``(state, action, reward, next_state)`` transitions in order.
+
+        Equivalent to calling :meth:`update` for each transition, with the
+        table and hyper-parameters bound once for the whole batch.
+        """
+        q_table = self.q_table
+        alpha = self.alpha
+        keep = 1.0 - alpha
+        gamma = self.gamma
+        epsilon = self.epsilon
+        epsilon_end = self.epsilon_end
+        epsilon_decay = self.epsilon_decay
+        for state, action, reward, next_state in transitions:
+            state_map = q_table.setdefault(state, {})
+            current = state_map.get(action, 0.0)
+            best_next = 0.0
+            if legal_actions:
+                next_values = q_table.get(next_state, {})
+                best_next = max(next_values.get(a, 0.0) for a in legal_actions)
+            state_map[action] = keep * current + alpha * (reward + gamma * best_next)
+            if epsilon > epsilon_end:
+                epsilon *= epsilon_decay
+                if epsilon < epsilon_end:
+                    epsilon = epsilon_end
+        self.epsilon = epsilon
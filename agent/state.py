@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from functools import lru_cache
 
 HEALTH_BUCKETS = 20
 TIME_BUCKETS = 6
@@ -20,6 +20,41 @@ def _time_bucket(t: float, episode_seconds: float) -> int:
     return min(TIME_BUCKETS - 1, int(ratio * TIME_BUCKETS))
 
 
+def state_buckets(
+    my_hp: float, enemy_hp: float, t: float, episode_seconds: float
+) -> tuple[int, int, int]:
+    """Return the ``(my, enemy, time)`` buckets shared by every action's key."""
+    return (
+        _bucket(my_hp, HEALTH_BUCKETS),
+        _bucket(enemy_hp, HEALTH_BUCKETS),
+        _time_bucket(t, episode_seconds),
+    )
+
+
+@lru_cache(maxsize=16384)
+def state_key(buckets: tuple[int, int, int], last_action: str) -> str:
+    """JSON state key for ``buckets`` plus the last action taken."""
+    # The bucketed state space is small and revisited constantly, so each key
+    # is JSON-encoded once and then served from the cache.
+    my, enemy, time_bucket = buckets
+    return json.dumps(
+        {"my": my, "enemy": enemy, "time": time_bucket, "last": last_action},
+        sort_keys=True,
+    )
+
+
+def make_state_parts(
+    my_hp: float,
+    enemy_hp: float,
+    t: float,
+    last_action: str,
+    episode_seconds: float,
+) -> tuple[str, int]:
+    """Return ``(state_json, time_bucket)`` so callers need not re-parse the key."""
+    buckets = state_buckets(my_hp, enemy_hp, t, episode_seconds)
+    return state_key(buckets, last_action), buckets[2]
+
+
 def make_state(
     my_hp: float,
     enemy_hp: float,
@@ -27,10 +62,4 @@ def make_state(
     last_action: str,
     episode_seconds: float,
 ) -> str:
-    state: dict[str, Any] = {
-        "my": _bucket(my_hp, HEALTH_BUCKETS),
-        "enemy": _bucket(enemy_hp, HEALTH_BUCKETS),
-        "time": _time_bucket(t, episode_seconds),
-        "last": last_action,
-    }
-    return json.dumps(state, sort_keys=True)
+    return make_state_parts(my_hp, enemy_hp, t, last_action, episode_seconds)[0]
@@ -29,6 +29,8 @@ def create_app() -> Flask:
     app.config["FEATURE_FLAGS"] = dict(config.features)
     app.config.update(config.features)
     app.config["X_API_KEYS"] = set(config.api_keys)
+    # Resolved once here so request handlers skip the config lookup.
+    app.extensions["_db_url"] = config.database_url
     persistence.init_storage(config.database_url)
     brain.ensure_brain_initialized(config.database_url, serialize_rules(DEFAULT_RULES))
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 import ctypes
 import logging
 import os
+import queue
 import sys
 import time
 import threading
@@ -12,6 +13,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Callable, List, Optional, Tuple
 
+import numpy as np
+
 from runner.events import EventLogger
 
 
@@ -58,6 +61,25 @@ except ImportError:  # pragma: no cover - handled at runtime
     mss = None  # type: ignore
     mss_tools = None  # type: ignore
 
+try:  # Optional dependency for lossy screenshot formats
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover - handled at runtime
+    Image = None  # type: ignore
+
+# Screenshot suffixes encoded through Pillow; anything else is written as PNG.
+_PIL_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+
+def _write_screenshot(
+    rgb_bytes: bytes, size: Tuple[int, int], path: Path, quality: int = 85
+) -> None:
+    """Write packed RGB bytes to ``path``, picking the encoder from its suffix."""
+    pil_format = _PIL_FORMATS.get(path.suffix.lower())
+    if pil_format is None:
+        mss_tools.to_png(rgb_bytes, size, output=str(path))  # type: ignore[union-attr]
+        return
+    Image.frombytes("RGB", size, rgb_bytes).save(path, pil_format, quality=quality)
+
 
 @dataclass
 class ArtifactPaths:
@@ -129,6 +151,243 @@ def create_artifact_paths(root: Path, run_id: str | None = None) -> ArtifactPath
     )
 
 
+@dataclass
+class BackgroundScreenshotWriter:
+    """Encode and write screenshots on a worker thread.
+
+    Callers hand off raw RGB frames through a bounded queue so encoding and
+    disk writes never block the capture loop; a full queue applies
+    backpressure instead of growing memory without bound. The format follows
+    the path suffix: ``.jpg``/``.jpeg``/``.webp`` are encoded by Pillow at
+    ``quality`` (far cheaper than deflate on full-resolution frames), anything
+    else is written as PNG.
+    """
+
+    max_pending: int = 32
+    quality: int = 85
+    _queue: "queue.Queue[Tuple[bytes, Tuple[int, int], Path] | None]" = field(
+        init=False
+    )
+    _thread: threading.Thread | None = field(default=None, init=False)
+    _written: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self._queue = queue.Queue(maxsize=max(1, self.max_pending))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._write_loop,
+            name="screenshot-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, rgb_bytes: bytes, size: Tuple[int, int], path: Path) -> None:
+        encoder = Image if path.suffix.lower() in _PIL_FORMATS else mss_tools
+        if encoder is None:  # pragma: no cover - environment specific
+            return
+        self.start()
+        self._queue.put((rgb_bytes, size, path))
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            rgb_bytes, size, path = item
+            try:
+                _write_screenshot(rgb_bytes, size, path, self.quality)
+                self._written += 1
+            except Exception as exc:  # pragma: no cover - defensive
+                LOGGER.warning("Unable to write screenshot %s: %s", path, exc)
+
+
+@dataclass
+class CapturedFrame:
+    """One grab handed from BackgroundGrabber to its consumer.
+
+    ``raw`` is mss's BGRA buffer, passed through without copying; the packed
+    RGB bytes are only built (once) if a consumer asks for :attr:`rgb`.
+    """
+
+    width: int
+    height: int
+    raw: bytes
+    monitor: dict
+    rect_info: dict
+    grabbed_at: float
+    _rgb: bytes | None = field(default=None, init=False, repr=False)
+
+    @property
+    def bgra(self) -> np.ndarray:
+        return np.frombuffer(self.raw, dtype=np.uint8).reshape(
+            self.height, self.width, 4
+        )
+
+    @property
+    def rgb(self) -> bytes:
+        if self._rgb is None:
+            self._rgb = self.bgra[..., 2::-1].tobytes()
+        return self._rgb
+
+
+@dataclass
+class BackgroundGrabber:
+    """Grab screen frames on a worker thread so capture overlaps processing.
+
+    ``region_fn(screen)`` runs on the worker for every grab and returns the
+    ``(region, info)`` pair to capture; exceptions it raises are re-raised from
+    :meth:`get` on the consumer thread. mss handles are per-thread, so the
+    worker owns its own ``mss.mss()`` instance.
+
+    Grabs happen on demand only: :meth:`request` starts one in the background
+    (call it about :attr:`grab_seconds` before the frame is needed) and
+    :meth:`get` returns it, requesting a grab itself if none is pending. The
+    worker idles between requests instead of grabbing frames nobody reads.
+    """
+
+    region_fn: Callable[[object], Tuple[dict, dict]]
+    _cond: threading.Condition = field(default_factory=threading.Condition, init=False)
+    _frame: CapturedFrame | None = field(default=None, init=False)
+    _error: BaseException | None = field(default=None, init=False)
+    _wanted: bool = field(default=False, init=False)
+    _grab_seconds: float = field(default=0.0, init=False)
+    _thread: threading.Thread | None = field(default=None, init=False)
+    _stop_event: threading.Event = field(default_factory=threading.Event, init=False)
+    _drained_at: float = field(default=0.0, init=False)
+
+    def __enter__(self) -> "BackgroundGrabber":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
+
+    @property
+    def grab_seconds(self) -> float:
+        """Smoothed duration of one ``region_fn`` + grab on the worker."""
+        return self._grab_seconds
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if mss is None:  # pragma: no cover - environment specific
+            raise RuntimeError("mss is required for screen capture")
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._grab_loop,
+            name="screen-grabber",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def request(self) -> None:
+        """Start grabbing the next frame without waiting for it."""
+        self.start()
+        with self._cond:
+            if self._frame is None and not self._wanted:
+                self._wanted = True
+                self._cond.notify_all()
+
+    def get(self, timeout: float | None = None) -> CapturedFrame:
+        """Return the requested frame, grabbing one if none is pending.
+
+        Raises :class:`queue.Empty` if no frame arrives within ``timeout``.
+        """
+        self.start()
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                frame = self._frame
+                if frame is not None:
+                    self._frame = None
+                    # A grab already in flight during drain() lands afterwards.
+                    if frame.grabbed_at >= self._drained_at:
+                        return frame
+                    continue
+                if self._error is not None:
+                    raise self._error
+                if not self._wanted:
+                    self._wanted = True
+                    self._cond.notify_all()
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise queue.Empty
+                self._cond.wait(remaining)
+
+    def drain(self) -> None:
+        """Drop frames grabbed before now (e.g. across an episode boundary)."""
+        with self._cond:
+            self._drained_at = time.perf_counter()
+            self._frame = None
+            if self._error is not None:
+                raise self._error
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is None:
+            return
+        with self._cond:
+            self._frame = None
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _grab_loop(self) -> None:
+        try:
+            with mss.mss() as screen:  # type: ignore[attr-defined]
+                monitor = screen.monitors[0]
+                while True:
+                    with self._cond:
+                        self._cond.wait_for(
+                            lambda: self._wanted or self._stop_event.is_set()
+                        )
+                    if self._stop_event.is_set():
+                        return
+                    started = time.perf_counter()
+                    region, info = self.region_fn(screen)
+                    grabbed_at = time.perf_counter()
+                    shot = screen.grab(region)
+                    width, height = shot.size
+                    frame = CapturedFrame(
+                        width=width,
+                        height=height,
+                        raw=shot.raw,
+                        monitor=monitor,
+                        rect_info=info,
+                        grabbed_at=grabbed_at,
+                    )
+                    elapsed = time.perf_counter() - started
+                    with self._cond:
+                        self._grab_seconds = (
+                            elapsed
+                            if not self._grab_seconds
+                            else 0.8 * self._grab_seconds + 0.2 * elapsed
+                        )
+                        self._wanted = False
+                        self._frame = frame
+                        self._cond.notify_all()
+        except BaseException as exc:  # surfaced to the consumer via get()
+            with self._cond:
+                self._error = exc
+                self._cond.notify_all()
+
+
 @dataclass
 class ScreenshotRecorder:
     """Capture periodic or manual screenshots for artifact collection."""
@@ -9,9 +9,10 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, Optional, Tuple
 
 try:  # Optional dependency
-    from PIL import Image
+    from PIL import Image, ImageDraw
 except ImportError:  # pragma: no cover - environment specific
     Image = None  # type: ignore[assignment]
+    ImageDraw = None  # type: ignore[assignment]
 
 try:  # Optional dependency
     import numpy as np
@@ -60,15 +61,31 @@ def _to_pil(image: Any, *, color_order: str = "RGB") -> "Image.Image":
     raise TypeError("Unsupported image type; expected PIL.Image or numpy ndarray.")
 
 
-def _crop_roi(image: "Image.Image", roi_n: Tuple[float, float, float, float]) -> "Image.Image":
-    width, height = image.size
+def _roi_box(
+    roi_n: Tuple[float, float, float, float], width: int, height: int
+) -> Tuple[int, int, int, int]:
     x1 = max(0, min(width, int(round(roi_n[0] * width))))
     y1 = max(0, min(height, int(round(roi_n[1] * height))))
     x2 = max(0, min(width, int(round(roi_n[2] * width))))
     y2 = max(0, min(height, int(round(roi_n[3] * height))))
     if x2 <= x1 or y2 <= y1:
-        return image.crop((0, 0, 1, 1))
-    return image.crop((x1, y1, x2, y2))
+        return (0, 0, 1, 1)
+    return (x1, y1, x2, y2)
+
+
+def _crop_box(image: Any, box: Tuple[int, int, int, int], *, color_order: str = "RGB") -> "Image.Image":
+    """Crop a PIL image or HxWxC ndarray to ``box``; arrays are sliced before
+    conversion so only the cropped pixels are copied into PIL."""
+    if np is not None and isinstance(image, np.ndarray):
+        x1, y1, x2, y2 = box
+        return _to_pil(image[y1:y2, x1:x2], color_order=color_order)
+    return _to_pil(image, color_order=color_order).crop(box)
+
+
+def _frame_size(image: Any) -> Tuple[int, int]:
+    if np is not None and isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
 
 
 def _filled_ratio(
@@ -104,8 +121,6 @@ def estimate_health_poly(
         poly_px[:, 1] = np.clip(poly_px[:, 1] + y_offset_px, 0, height)
 
     mask = Image.new("L", (width, height), 0)
-    from PIL import ImageDraw  # type: ignore
-
     ImageDraw.Draw(mask).polygon([tuple(p) for p in poly_px], outline=255, fill=255)
     mask_np = np.array(mask)
 
@@ -119,6 +134,67 @@ def estimate_health_poly(
     return float(valid.sum()) / float(total if total > 0 else 1)
 
 
+@dataclass(frozen=True)
+class PolyMask:
+    """A HUD polygon rasterized once for a fixed frame size and y offset.
+
+    ``box`` is the polygon's bounding box (x1, y1, x2, y2) clipped to the frame,
+    ``mask`` is the filled polygon inside that box and ``total`` its pixel count.
+    """
+
+    box: Tuple[int, int, int, int]
+    mask: "np.ndarray"
+    total: int
+
+
+def build_poly_mask(
+    poly_norm: list[tuple[float, float]],
+    width: int,
+    height: int,
+    *,
+    y_offset_px: int = 0,
+) -> PolyMask:
+    if np is None or Image is None:
+        raise RuntimeError("numpy and Pillow are required for polygon health extraction.")
+    poly_px = norm_poly_to_px(poly_norm, width, height)
+    if y_offset_px:
+        poly_px[:, 1] = np.clip(poly_px[:, 1] + y_offset_px, 0, height)
+    x1 = max(0, min(width, int(poly_px[:, 0].min())))
+    y1 = max(0, min(height, int(poly_px[:, 1].min())))
+    x2 = max(x1, min(width, int(poly_px[:, 0].max()) + 1))
+    y2 = max(y1, min(height, int(poly_px[:, 1].max()) + 1))
+    if x2 <= x1 or y2 <= y1:
+        return PolyMask(box=(0, 0, 0, 0), mask=np.zeros((0, 0), dtype=bool), total=0)
+
+    mask = Image.new("L", (x2 - x1, y2 - y1), 0)
+    local = [(int(x) - x1, int(y) - y1) for x, y in poly_px]
+    ImageDraw.Draw(mask).polygon(local, outline=255, fill=255)
+    mask_np = np.array(mask) == 255
+    return PolyMask(box=(x1, y1, x2, y2), mask=mask_np, total=int(mask_np.sum()))
+
+
+def estimate_health_poly_px(
+    image: Any,
+    poly_mask: PolyMask,
+    *,
+    s_min: int = DEFAULT_S_MIN,
+    v_min: int = DEFAULT_V_MIN,
+    color_order: str = "RGB",
+) -> float:
+    """Like estimate_health_poly, but with a prebuilt mask; only the polygon's
+    bounding box is converted to HSV. ``image`` may be a PIL image or an HxWxC
+    ndarray."""
+    if not poly_mask.total:
+        return 0.0
+    crop = _crop_box(image, poly_mask.box, color_order=color_order)
+    hsv = np.array(crop.convert("HSV"))
+    h = hsv[..., 0]
+    s = hsv[..., 1]
+    v = hsv[..., 2]
+    red = ((h < 10) | (h > 170)) & (s > s_min) & (v > v_min)
+    return float((red & poly_mask.mask).sum()) / float(poly_mask.total)
+
+
 def extract_health(
     frame: Any,
     *,
@@ -128,9 +204,11 @@ def extract_health(
     v_min: int = DEFAULT_V_MIN,
     color_order: str = "RGB",
 ) -> Tuple[float, float]:
-    image = _to_pil(frame, color_order=color_order)
-    p1 = _filled_ratio(_crop_roi(image, p1_roi), s_min=s_min, v_min=v_min)
-    p2 = _filled_ratio(_crop_roi(image, p2_roi), s_min=s_min, v_min=v_min)
+    width, height = _frame_size(frame)
+    p1_crop = _crop_box(frame, _roi_box(p1_roi, width, height), color_order=color_order)
+    p2_crop = _crop_box(frame, _roi_box(p2_roi, width, height), color_order=color_order)
+    p1 = _filled_ratio(p1_crop, s_min=s_min, v_min=v_min)
+    p2 = _filled_ratio(p2_crop, s_min=s_min, v_min=v_min)
     return p1, p2
 
 
@@ -9,6 +9,11 @@ from flask import abort, current_app, g, jsonify, request
 
 from .ratelimit import RateLimiter
 
+try:  # Optional dependency for fast JSON responses
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    orjson = None  # type: ignore
+
 JsonResult = tuple[Any, int] | tuple[Any, int, dict[str, Any]] | Any
 
 _rate_limiter = RateLimiter()
@@ -92,6 +97,18 @@ def require_feature(name: str, *, behavior: str = "hide"):
     return decorator
 
 
+def _json_response(payload: Any):
+    """Serialize ``payload`` like ``jsonify``, via orjson when it is installed."""
+
+    if orjson is not None:
+        try:
+            body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        except TypeError:  # types only Flask's provider knows; let it handle them
+            return jsonify(payload)
+        return current_app.response_class(body + b"\n", mimetype="application/json")
+    return jsonify(payload)
+
+
 def json_endpoint(func: Callable[..., JsonResult]) -> Callable[..., Any]:
     """Ensure JSON responses with standard error handling."""
 
@@ -100,23 +117,23 @@ def json_endpoint(func: Callable[..., JsonResult]) -> Callable[..., Any]:
         try:
             result = func(*args, **kwargs)
         except ValueError as exc:  # validation error
-            return jsonify({"error": str(exc)}), 400
+            return _json_response({"error": str(exc)}), 400
         except Exception as exc:  # pragma: no cover - log unexpected errors
             current_app.logger.exception(
                 "Unhandled error in JSON endpoint", exc_info=exc
             )
-            return jsonify({"error": "Internal server error"}), 500
+            return _json_response({"error": "Internal server error"}), 500
 
         if isinstance(result, tuple):
             payload = result[0]
             status = result[1]
             headers = result[2] if len(result) > 2 else None
-            response = jsonify(payload)
+            response = _json_response(payload)
             if headers:
                 for key, value in headers.items():
                     response.headers[key] = value
             return response, status
-        return jsonify(result)
+        return _json_response(result)
 
     return wrapper
 
@@ -281,12 +281,21 @@ def list_episodes(
     limit: int = 50,
     offset: int = 0,
     filters: Dict[str, str] | None = None,
+    after_id: int | None = None,
 ) -> List[Dict[str, Any]]:
+    """Return episodes newest first.
+
+    ``after_id`` is a keyset cursor: only episodes with a smaller id are
+    returned, so deep pages cost the same as the first. Prefer it over
+    ``offset``, which SQLite must scan past.
+    """
     if limit < 1:
         raise ValueError("limit must be >= 1")
     limit = min(limit, 200)
     if offset < 0:
         raise ValueError("offset must be >= 0")
+    if after_id is not None and after_id < 1:
+        raise ValueError("after_id must be >= 1")
 
     coerced_filters = _coerce_filters(filters)
     conditions: List[str] = []
@@ -296,6 +305,9 @@ def list_episodes(
         if value:
             conditions.append(f"{column} = ?")
             params.append(value)
+    if after_id is not None:
+        conditions.append("id < ?")
+        params.append(after_id)
 
     where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
 
@@ -0,0 +1,53 @@
+"""Shared fixtures for the test suite."""
+from __future__ import annotations
+
+import enum
+import sys
+import types
+
+import pytest
+
+# Modules that import vgamepad at load time; reloaded against the stub.
+_VGAMEPAD_DEPENDENTS = (
+    "agent.action_set",
+    "tools.agent_loop",
+    "tools.replay_controller_state",
+    "trainer",
+)
+
+
+class _XusbButton(enum.IntFlag):
+    XUSB_GAMEPAD_DPAD_UP = 0x0001
+    XUSB_GAMEPAD_DPAD_DOWN = 0x0002
+    XUSB_GAMEPAD_DPAD_LEFT = 0x0004
+    XUSB_GAMEPAD_DPAD_RIGHT = 0x0008
+    XUSB_GAMEPAD_START = 0x0010
+    XUSB_GAMEPAD_BACK = 0x0020
+    XUSB_GAMEPAD_LEFT_THUMB = 0x0040
+    XUSB_GAMEPAD_RIGHT_THUMB = 0x0080
+    XUSB_GAMEPAD_LEFT_SHOULDER = 0x0100
+    XUSB_GAMEPAD_RIGHT_SHOULDER = 0x0200
+    XUSB_GAMEPAD_GUIDE = 0x0400
+    XUSB_GAMEPAD_A = 0x1000
+    XUSB_GAMEPAD_B = 0x2000
+    XUSB_GAMEPAD_X = 0x4000
+    XUSB_GAMEPAD_Y = 0x8000
+
+
+@pytest.fixture(scope="module")
+def vgamepad_stub():
+    """Install a stand-in ``vgamepad`` module for the duration of a test module.
+
+    The real package needs ViGEm (Windows) or libevdev (Linux) just to import;
+    the code under test only needs its button enum at import time.
+    """
+    stub = types.ModuleType("vgamepad")
+    stub.XUSB_BUTTON = _XusbButton
+    stub.VX360Gamepad = object
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "vgamepad", stub)
+        for name in _VGAMEPAD_DEPENDENTS:
+            mp.delitem(sys.modules, name, raising=False)
+        yield stub
+    for name in _VGAMEPAD_DEPENDENTS:
+        sys.modules.pop(name, None)
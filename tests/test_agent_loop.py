@@ -0,0 +1,49 @@
+"""Tests for the agent loop's payload serialization."""
+from __future__ import annotations
+
+import importlib
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def agent_loop(vgamepad_stub):
+    return importlib.import_module("tools.agent_loop")
+
+
+def _health(p1: float, p2: float, d_p1: float, d_p2: float) -> dict:
+    return {"p1": p1, "p2": p2, "d_p1": d_p1, "d_p2": d_p2}
+
+
+@pytest.mark.parametrize(
+    ("action", "reward", "health", "screenshot"),
+    [
+        ("LP", 0.125, _health(0.9, 0.7, -0.1, 0.0), Path("shots/agent_00001.png")),
+        ("NEUTRAL", -1e-9, _health(1.0, 1.0, 0.0, 0.0), None),
+        ("WALK_FWD", math.nan, _health(math.nan, 0.5, math.inf, -math.inf), None),
+        ('odd "name"\\', 1.0, _health(0.1, 0.2, 0.3, 0.4), Path('we"ird\\path.png')),
+    ],
+)
+def test_entry_line_matches_json_dumps(
+    agent_loop, action, reward, health, screenshot
+) -> None:
+    prev_health = _health(1.0, 0.8, 0.0, -0.2)
+    ts_utc = "2026-01-02T03:04:05.678901+00:00"
+
+    line = agent_loop._entry_line(
+        ts_utc, 12.5, prev_health, action, reward, health, screenshot
+    )
+
+    expected = {
+        "ts_utc": ts_utc,
+        "t_run_s": 12.5,
+        "obs": {"health": prev_health},
+        "action": action,
+        "reward": reward,
+        "next_obs": {"health": health},
+        "screenshot": str(screenshot) if screenshot else None,
+    }
+    assert line == json.dumps(expected) + "\n"
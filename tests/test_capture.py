@@ -1,11 +1,17 @@
 """Tests for Unity screenshot capture behavior."""
 from __future__ import annotations
 
+import queue
+import threading
 from pathlib import Path
 
+import pytest
+
 from runner.capture import (
     UNITY_WINDOW_DISABLED_WARNING,
     UNITY_WINDOW_WAIT_TIMEOUT_SECONDS,
+    BackgroundGrabber,
+    BackgroundScreenshotWriter,
     create_artifact_paths,
     ScreenshotRecorder,
 )
@@ -48,3 +54,151 @@ def test_unity_window_missing_disables_after_timeout(tmp_path, monkeypatch) -> N
     assert recorder.disabled_reason == "unity-window-missing"
     assert recorder.capture_mode == "unity_window"
     assert UNITY_WINDOW_DISABLED_WARNING in recorder.warnings
+
+
+def test_background_screenshot_writer_flushes_on_close(tmp_path) -> None:
+    writer = BackgroundScreenshotWriter(max_pending=2)
+    frame = bytes([10, 20, 30]) * 4
+    paths = [Path(tmp_path) / f"frame_{idx}.png" for idx in range(5)]
+    for path in paths:
+        writer.submit(frame, (2, 2), path)
+    writer.close()
+
+    assert writer.written == len(paths)
+    for path in paths:
+        assert path.read_bytes().startswith(b"\x89PNG")
+
+
+class _FakeShot:
+    def __init__(self, index: int) -> None:
+        self.size = (2, 1)
+        # BGRA pixels: blue=index, green=20, red=30, alpha=255
+        self.raw = bytearray([index % 256, 20, 30, 255]) * 2
+
+
+class _FakeMss:
+    def __init__(self) -> None:
+        self.monitors = [{"left": 0, "top": 0, "width": 2, "height": 1}]
+        self.grabs = 0
+
+    def __enter__(self) -> "_FakeMss":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+    def grab(self, _region):
+        self.grabs += 1
+        return _FakeShot(self.grabs)
+
+
+class _FakeMssModule:
+    @staticmethod
+    def mss() -> _FakeMss:
+        return _FakeMss()
+
+
+def test_background_grabber_delivers_frames_and_errors(monkeypatch) -> None:
+    monkeypatch.setattr(capture_module, "mss", _FakeMssModule)
+    calls = []
+    proceed = threading.Event()
+
+    def region_fn(screen):
+        calls.append(screen)
+        if len(calls) == 2:
+            proceed.wait(5)
+        if len(calls) > 3:
+            raise SystemExit("window lost")
+        return screen.monitors[0], {"client_rect": None}
+
+    grabber = BackgroundGrabber(region_fn=region_fn)
+    try:
+        first = grabber.get(timeout=5)
+        assert (first.width, first.height) == (2, 1)
+        assert first.bgra.shape == (1, 2, 4)
+        assert first.rgb == bytes([30, 20, 1]) * 2
+        assert first.rect_info == {"client_rect": None}
+        assert first.monitor["width"] == 2
+        proceed.set()
+        with pytest.raises(SystemExit, match="window lost"):
+            while True:
+                grabber.get(timeout=5)
+    finally:
+        grabber.stop()
+
+
+def test_background_grabber_grabs_only_on_request(monkeypatch) -> None:
+    monkeypatch.setattr(capture_module, "mss", _FakeMssModule)
+    calls = []
+    grabbed = threading.Event()
+
+    def region_fn(screen):
+        calls.append(screen)
+        grabbed.set()
+        return screen.monitors[0], {"client_rect": None}
+
+    grabber = BackgroundGrabber(region_fn=region_fn)
+    try:
+        grabber.start()
+        assert not grabbed.wait(0.1)
+        assert calls == []
+
+        first = grabber.get(timeout=5)
+        assert first.rgb == bytes([30, 20, 1]) * 2
+        grabbed.clear()
+        grabber.request()
+        assert grabbed.wait(5)
+        prefetched = grabber.get(timeout=5)
+        assert prefetched.rgb == bytes([30, 20, 2]) * 2
+        assert prefetched.grabbed_at > first.grabbed_at
+        assert len(calls) == 2
+        assert grabber.grab_seconds > 0
+    finally:
+        grabber.stop()
+
+
+def test_background_grabber_get_times_out(monkeypatch) -> None:
+    monkeypatch.setattr(capture_module, "mss", _FakeMssModule)
+    release = threading.Event()
+
+    def region_fn(screen):
+        release.wait(5)
+        return screen.monitors[0], {"client_rect": None}
+
+    grabber = BackgroundGrabber(region_fn=region_fn)
+    try:
+        with pytest.raises(queue.Empty):
+            grabber.get(timeout=0.05)
+        release.set()
+        assert grabber.get(timeout=5).width == 2
+    finally:
+        grabber.stop()
+
+
+def test_background_grabber_drain_drops_older_frames(monkeypatch) -> None:
+    monkeypatch.setattr(capture_module, "mss", _FakeMssModule)
+    grabber = BackgroundGrabber(
+        region_fn=lambda screen: (screen.monitors[0], {"client_rect": None})
+    )
+    try:
+        grabber.get(timeout=5)
+        grabber.drain()
+        fresh = grabber.get(timeout=5)
+        assert fresh.grabbed_at >= grabber._drained_at
+    finally:
+        grabber.stop()
+
+
+def test_background_screenshot_writer_encodes_lossy_suffixes(tmp_path) -> None:
+    pytest.importorskip("PIL")
+    writer = BackgroundScreenshotWriter(max_pending=2, quality=70)
+    frame = bytes([10, 20, 30]) * 16
+    jpg_path = Path(tmp_path) / "frame.jpg"
+    png_path = Path(tmp_path) / "frame.png"
+    writer.submit(frame, (4, 4), jpg_path)
+    writer.submit(frame, (4, 4), png_path)
+    writer.close()
+
+    assert writer.written == 2
+    assert jpg_path.read_bytes().startswith(b"\xff\xd8")
+    assert png_path.read_bytes().startswith(b"\x89PNG")
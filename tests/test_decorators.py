@@ -23,6 +23,11 @@ def app_client():
     def json_view():
         return {"status": "ok"}
 
+    @app.route("/json-created")
+    @json_endpoint
+    def json_created():
+        return {"id": 7, "tags": ["a", "b"]}, 201, {"X-Extra": "1"}
+
     @app.route("/json-error")
     @json_endpoint
     def json_error():
@@ -55,6 +60,14 @@ def test_json_endpoint_success(app_client):
     assert response.get_json()["status"] == "ok"
 
 
+def test_json_endpoint_tuple_sets_status_and_headers(app_client):
+    response = app_client.get("/json-created")
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.headers["X-Extra"] == "1"
+    assert response.get_json() == {"id": 7, "tags": ["a", "b"]}
+
+
 def test_json_endpoint_handles_value_error(app_client):
     response = app_client.get("/json-error")
     assert response.status_code == 400
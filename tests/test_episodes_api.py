@@ -205,3 +205,26 @@ def test_invalid_scenario_rejected(client):
         headers={"X-API-Key": "alpha"},
     )
     assert response.status_code == 400
+
+
+def test_after_id_pages_through_episodes(client):
+    headers = {"X-API-Key": "alpha"}
+    ids = [
+        client.post("/api/episodes", json=_valid_payload(), headers=headers).get_json()[
+            "episode_id"
+        ]
+        for _ in range(3)
+    ]
+
+    first = client.get("/api/episodes?limit=2", headers=headers).get_json()
+    assert [ep["id"] for ep in first["episodes"]] == ids[:0:-1]
+    assert first["next_after_id"] == ids[1]
+
+    second = client.get(
+        f"/api/episodes?limit=2&after_id={first['next_after_id']}", headers=headers
+    ).get_json()
+    assert [ep["id"] for ep in second["episodes"]] == [ids[0]]
+    assert second["next_after_id"] is None
+
+    bad = client.get("/api/episodes?after_id=0", headers=headers)
+    assert bad.status_code == 400
@@ -0,0 +1,54 @@
+"""Tests for HUD polygon health extraction."""
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from runner.health_bar import (  # noqa: E402
+    P1_BAR_POLY_NORM,
+    P2_BAR_POLY_NORM,
+    build_poly_mask,
+    estimate_health_poly,
+    estimate_health_poly_px,
+    extract_health,
+)
+
+
+def _hud_frame(width: int, height: int) -> "Image.Image":
+    rng = np.random.default_rng(7)
+    pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    # Paint a saturated red band across the left bar so the ratio is non-trivial.
+    pixels[
+        int(0.06 * height) : int(0.08 * height), int(0.1 * width) : int(0.3 * width)
+    ] = (
+        220,
+        10,
+        10,
+    )
+    return Image.fromarray(pixels, mode="RGB")
+
+
+@pytest.mark.parametrize("y_offset_px", [0, 12, -5])
+def test_poly_mask_matches_full_frame_estimate(y_offset_px: int) -> None:
+    width, height = 640, 360
+    image = _hud_frame(width, height)
+    for poly in (P1_BAR_POLY_NORM, P2_BAR_POLY_NORM):
+        expected = estimate_health_poly(image, poly, y_offset_px=y_offset_px)
+        poly_mask = build_poly_mask(poly, width, height, y_offset_px=y_offset_px)
+        assert estimate_health_poly_px(image, poly_mask) == pytest.approx(expected)
+
+
+def test_ndarray_inputs_match_pil_inputs() -> None:
+    width, height = 640, 360
+    image = _hud_frame(width, height)
+    pixels = np.asarray(image)
+    bgra = np.dstack([pixels[..., ::-1], np.full((height, width), 255, np.uint8)])
+    rgb_view = bgra[..., 2::-1]
+
+    poly_mask = build_poly_mask(P1_BAR_POLY_NORM, width, height)
+    assert estimate_health_poly_px(rgb_view, poly_mask) == pytest.approx(
+        estimate_health_poly_px(image, poly_mask)
+    )
+    assert extract_health(rgb_view) == pytest.approx(extract_health(image))
@@ -1,4 +1,4 @@
-from agent.q_learner import QLearner
+from agent.q_learner import QLearner, write_policy
 
 
 def test_q_update_increases_for_positive_reward():
@@ -16,3 +16,34 @@ def test_epsilon_greedy_returns_valid_action():
     actions = ["A", "B", "C"]
     action = learner.select_action(state, actions)
     assert action in actions
+
+
+def test_update_batch_matches_sequential_updates():
+    actions = ["A", "B"]
+    transitions = [
+        ("s1", "A", 1.0, "s2"),
+        ("s2", "B", -0.5, "s1"),
+        ("s1", "A", 0.25, "s1"),
+        ("s3", "B", 0.0, "s2"),
+    ]
+    sequential = QLearner(alpha=0.5, gamma=0.9, epsilon=0.5, epsilon_decay=0.9)
+    for state, action, reward, next_state in transitions:
+        sequential.update(state, action, reward, next_state, actions)
+    batched = QLearner(alpha=0.5, gamma=0.9, epsilon=0.5, epsilon_decay=0.9)
+    batched.update_batch(transitions, actions)
+    assert batched.q_table == sequential.q_table
+    assert batched.epsilon == sequential.epsilon
+
+
+def test_snapshot_is_detached_and_round_trips(tmp_path):
+    learner = QLearner(alpha=0.5, gamma=0.9, epsilon=0.0)
+    learner.update("s1", "A", reward=1.0, next_state="s2", legal_actions=["A", "B"])
+    snapshot = learner.snapshot()
+    learner.update("s1", "A", reward=1.0, next_state="s2", legal_actions=["A", "B"])
+    assert snapshot["q_table"]["s1"]["A"] < learner.q_table["s1"]["A"]
+
+    path = tmp_path / "policy.json"
+    write_policy(snapshot, path)
+    loaded = QLearner.load(path)
+    assert loaded.q_table == snapshot["q_table"]
+    assert not path.with_name("policy.json.tmp").exists()
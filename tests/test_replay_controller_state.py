@@ -0,0 +1,116 @@
+"""Tests for the controller-state replay tool's quantization and row writer."""
+from __future__ import annotations
+
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def replay(vgamepad_stub):
+    return importlib.import_module("tools.replay_controller_state")
+
+
+class _ReportPad:
+    def __init__(self) -> None:
+        self.report = SimpleNamespace(
+            wButtons=0,
+            bLeftTrigger=0,
+            bRightTrigger=0,
+            sThumbLX=0,
+            sThumbLY=0,
+            sThumbRX=0,
+            sThumbRY=0,
+        )
+
+    def update(self) -> None:
+        pass
+
+
+def test_quantize_axes_matches_scalar_helpers(replay) -> None:
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [
+            rng.uniform(-1.2, 1.2, 50_000),
+            np.linspace(-1.0, 1.0, 65_537),
+            np.array([-1.0, -0.5, 0.0, 0.5, 1.0, 1.5, -1.5]),
+        ]
+    )
+    axes = np.repeat(values[:, None], len(replay._AXIS_NAMES), axis=1)
+
+    sticks, triggers = replay._quantize_axes(axes)
+
+    expected_sticks = [replay._stick_float_to_int16(float(v)) for v in values]
+    expected_triggers = [replay._trigger_float_to_uint8(float(v)) for v in values]
+    assert sticks.dtype == np.int16 and triggers.dtype == np.uint8
+    for column in range(4):
+        assert sticks[:, column].tolist() == expected_sticks
+    for column in range(2):
+        assert triggers[:, column].tolist() == expected_triggers
+
+
+def test_plan_replay_packs_frame_rows(replay) -> None:
+    axes = np.array([[1.0, -1.0, 0.5, 0.0, 0.0, 1.0]])
+    sticks, triggers = replay._quantize_axes(axes)
+    masks = np.array([0x1010], dtype=np.uint32)
+
+    plan = replay._plan_replay(sticks, triggers, masks)
+
+    assert [tuple(row) for row in plan.tolist()] == [
+        (32767, -32768, 16384, 0, 0, 255, 0x1010)
+    ]
+
+
+def test_row_writer_stages_report_fields_and_skips_unchanged(replay) -> None:
+    pad = _ReportPad()
+    write = replay.make_row_writer(pad, stick_epsilon=2)
+    sent = replay._new_sent_state()
+
+    assert write((100, -100, 0, 0, 10, 20, 0x1000), sent) is True
+    report = pad.report
+    assert (report.sThumbLX, report.sThumbLY) == (100, -100)
+    assert (report.bLeftTrigger, report.bRightTrigger) == (10, 20)
+    assert report.wButtons == 0x1000
+
+    # Stick jitter inside the epsilon and an unchanged mask stage nothing.
+    assert write((101, -99, 0, 0, 10, 20, 0x1000), sent) is False
+    assert report.sThumbLX == 100
+
+
+class _FloatOnlyPad:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def left_joystick_float(self, x: float, y: float) -> None:
+        self.calls.append(("ls", x, y))
+
+    def right_joystick_float(self, x: float, y: float) -> None:
+        self.calls.append(("rs", x, y))
+
+    def left_trigger_float(self, value: float) -> None:
+        self.calls.append(("lt", value))
+
+    def right_trigger_float(self, value: float) -> None:
+        self.calls.append(("rt", value))
+
+    def press_button(self, button) -> None:
+        self.calls.append(("press", int(button)))
+
+    def release_button(self, button) -> None:
+        self.calls.append(("release", int(button)))
+
+
+def test_row_writer_falls_back_to_float_setters(replay) -> None:
+    pad = _FloatOnlyPad()
+    write = replay.make_row_writer(pad)
+    sent = replay._new_sent_state()
+
+    assert write((32767, -32768, 0, 0, 255, 0, 0x1000), sent) is True
+
+    assert ("ls", 1.0, -1.0) in pad.calls
+    assert ("rs", 0.0, 0.0) in pad.calls
+    assert ("lt", 1.0) in pad.calls
+    assert ("rt", 0.0) in pad.calls
+    assert ("press", 0x1000) in pad.calls
@@ -1,6 +1,6 @@
 import json
 
-from agent.state import make_state
+from agent.state import make_state, make_state_parts, state_buckets, state_key
 
 
 def test_state_bucketing_stable_bounds():
@@ -9,3 +9,24 @@ def test_state_bucketing_stable_bounds():
     assert data["my"] >= 0
     assert data["enemy"] >= 0
     assert data["time"] >= 0
+
+
+def test_state_parts_match_state_json():
+    state, time_bucket = make_state_parts(0.5, 0.25, 45.0, "LIGHT_PUNCH", 60.0)
+    assert state == make_state(0.5, 0.25, 45.0, "LIGHT_PUNCH", 60.0)
+    assert time_bucket == json.loads(state)["time"]
+
+
+def test_cached_state_keys_stay_stable():
+    first = make_state(0.3, 0.9, 10.0, "HEAVY_KICK", 60.0)
+    again = make_state(0.3, 0.9, 10.0, "HEAVY_KICK", 60.0)
+    assert first == again
+    assert json.loads(first) == {"my": 6, "enemy": 18, "time": 1, "last": "HEAVY_KICK"}
+
+
+def test_state_key_shares_buckets_across_actions():
+    buckets = state_buckets(0.5, 0.25, 45.0, 60.0)
+    assert state_key(buckets, "LIGHT_PUNCH") == make_state(
+        0.5, 0.25, 45.0, "LIGHT_PUNCH", 60.0
+    )
+    assert state_key(buckets, "NEUTRAL") == make_state(0.5, 0.25, 45.0, "NEUTRAL", 60.0)
@@ -0,0 +1,28 @@
+"""Tests for the trainer's frame downsampling paths."""
+from __future__ import annotations
+
+import importlib
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def trainer(vgamepad_stub):
+    return importlib.import_module("trainer")
+
+
+@pytest.mark.parametrize("shape", [(36, 64), (110, 197), (1080, 1920)])
+def test_downsample_gray_cv2_matches_numpy(trainer, monkeypatch, shape) -> None:
+    cv2 = pytest.importorskip("cv2")
+    rng = np.random.default_rng(0)
+    bgra = rng.integers(0, 256, (*shape, 4), dtype=np.uint8)
+    monkeypatch.setattr(trainer, "_gray_pool_u8", None)
+
+    monkeypatch.setattr(trainer, "cv2", cv2)
+    with_cv2 = trainer._downsample_gray(bgra, (64, 36))
+    monkeypatch.setattr(trainer, "cv2", None)
+    with_numpy = trainer._downsample_gray(bgra, (64, 36))
+
+    assert with_cv2.dtype == np.uint8
+    assert with_cv2.tolist() == with_numpy.tolist()
@@ -7,24 +7,24 @@ from __future__ import annotations
 
 import argparse
 import json
-import random
+import math
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
+import numpy as np
 import vgamepad as vg
 
 from PIL import Image
 
 try:  # Optional dependency for screenshots
     import mss  # type: ignore
-    from mss import tools as mss_tools  # type: ignore
 except ImportError:  # pragma: no cover - environment specific
     mss = None  # type: ignore
-    mss_tools = None  # type: ignore
 
+from runner.capture import BackgroundScreenshotWriter
 from runner.health_bar import HealthBarTracker
 from agent.action_set import resolve_button
 
@@ -39,6 +39,8 @@ ACTION_SET = [
     "THROW",
 ]
 
+DECISION_BATCH = 4096
+
 
 @dataclass
 class ActionState:
@@ -92,10 +94,51 @@ def _action_state(action: str) -> ActionState:
     return ActionState()
 
 
-def _save_screenshot(rgb_bytes: bytes, size: tuple, path: Path) -> None:
-    if mss_tools is None:
-        return
-    mss_tools.to_png(rgb_bytes, size, output=str(path))  # type: ignore[arg-type]
+def _decision_stream(epsilon: float, seed: Optional[int] = None) -> Iterator[str]:
+    """Yield epsilon-greedy actions drawn in batches from a NumPy generator."""
+    rng = np.random.default_rng(seed)
+    actions = np.array(ACTION_SET)
+    while True:
+        picks = actions[rng.integers(len(ACTION_SET), size=DECISION_BATCH)]
+        explore = rng.random(DECISION_BATCH) < epsilon
+        yield from np.where(explore, picks, "NEUTRAL").tolist()
+
+
+def _json_float(value: float) -> str:
+    # json.dumps writes finite floats with repr(); NaN/inf spell differently.
+    value = float(value)
+    return repr(value) if math.isfinite(value) else json.dumps(value)
+
+
+def _health_json(health: Dict[str, float]) -> str:
+    return (
+        f'{{"p1": {_json_float(health["p1"])}, "p2": {_json_float(health["p2"])}, '
+        f'"d_p1": {_json_float(health["d_p1"])}, "d_p2": {_json_float(health["d_p2"])}}}'
+    )
+
+
+def _entry_line(
+    ts_utc: str,
+    t_run_s: float,
+    prev_health: Dict[str, float],
+    action: str,
+    reward: float,
+    health: Dict[str, float],
+    screenshot: Optional[Path],
+) -> str:
+    """Serialize one payload entry; byte-identical to json.dumps of the same dict.
+
+    The schema is fixed, so the layout is templated; strings still go through
+    json.dumps for escaping and floats through _json_float.
+    """
+    shot = json.dumps(str(screenshot)) if screenshot else "null"
+    return (
+        f'{{"ts_utc": {json.dumps(ts_utc)}, "t_run_s": {_json_float(t_run_s)}, '
+        f'"obs": {{"health": {_health_json(prev_health)}}}, '
+        f'"action": {json.dumps(action)}, "reward": {_json_float(reward)}, '
+        f'"next_obs": {{"health": {_health_json(health)}}}, '
+        f'"screenshot": {shot}}}\n'
+    )
 
 
 def parse_args() -> argparse.Namespace:
@@ -115,8 +158,6 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> int:
     args = parse_args()
-    if args.seed is not None:
-        random.seed(args.seed)
     if mss is None:
         raise SystemExit("mss is required for screenshot capture.")
 
@@ -133,88 +174,92 @@ def main() -> int:
     payload_path = run_dir / "episode_payload.jsonl"
 
     tracker = HealthBarTracker()
+    screenshot_writer = BackgroundScreenshotWriter()
     gamepad = vg.VX360Gamepad()
     start = time.perf_counter()
     next_tick = start
 
+    decisions = _decision_stream(args.epsilon, args.seed)
+
     prev_health: Optional[Dict[str, float]] = None
     prev_action: Optional[str] = None
     step = 0
 
-    with mss.mss() as screen:  # type: ignore[attr-defined]
-        monitor = screen.monitors[0]
-        while True:
-            now = time.perf_counter()
-            if now - start >= args.duration:
-                break
-
-            shot = screen.grab(monitor)
-            frame = shot.rgb
-            width, height = shot.size
-
-            if args.save_screenshots:
-                screenshot_name = f"agent_{ts}_{step:05d}.png"
-                screenshot_path = screenshots_dir / screenshot_name
-                _save_screenshot(frame, (width, height), screenshot_path)
-            else:
-                screenshot_path = None
-
-            image = Image.frombytes("RGB", (width, height), frame)
-            p1, p2 = tracker.update(image)
-
-            if prev_health is None:
-                health = {"p1": p1, "p2": p2, "d_p1": 0.0, "d_p2": 0.0}
-            else:
-                health = {
-                    "p1": p1,
-                    "p2": p2,
-                    "d_p1": p1 - prev_health["p1"],
-                    "d_p2": p2 - prev_health["p2"],
-                }
-
-            if prev_health is not None and prev_action is not None:
-                reward = (prev_health["p2"] - health["p2"]) - (
-                    prev_health["p1"] - health["p1"]
-                )
-                entry = {
-                    "ts_utc": datetime.now(timezone.utc).isoformat(),
-                    "t_run_s": now - start,
-                    "obs": {"health": prev_health},
-                    "action": prev_action,
-                    "reward": reward,
-                    "next_obs": {"health": health},
-                    "screenshot": str(screenshot_path) if screenshot_path else None,
-                }
-                with payload_path.open("a", encoding="utf-8") as handle:
-                    handle.write(json.dumps(entry) + "\n")
-
-            # choose action
-            action = (
-                random.choice(ACTION_SET) if random.random() < args.epsilon else "NEUTRAL"
-            )
-
-            # apply action macro
-            state = _action_state(action)
-            macro_steps = max(1, int(round(args.action_seconds / macro_dt)))
-            for _ in range(macro_steps):
-                _apply_state(gamepad, state)
-                time.sleep(macro_dt)
-            _apply_state(gamepad, ActionState())
-
-            prev_health = health
-            prev_action = action
-            step += 1
-
-            next_tick += decision_dt
-            sleep_s = next_tick - time.perf_counter()
-            if sleep_s > 0:
-                time.sleep(sleep_s)
-
     try:
-        if hasattr(gamepad, "reset"):
-            gamepad.reset()
-    except Exception:
-        pass
+        with mss.mss() as screen:  # type: ignore[attr-defined]
+            monitor = screen.monitors[0]
+            while True:
+                now = time.perf_counter()
+                if now - start >= args.duration:
+                    break
+
+                shot = screen.grab(monitor)
+                frame = shot.rgb
+                width, height = shot.size
+
+                if args.save_screenshots:
+                    screenshot_name = f"agent_{ts}_{step:05d}.png"
+                    screenshot_path = screenshots_dir / screenshot_name
+                    screenshot_writer.submit(frame, (width, height), screenshot_path)
+                else:
+                    screenshot_path = None
+
+                image = Image.frombytes("RGB", (width, height), frame)
+                p1, p2 = tracker.update(image)
+
+                if prev_health is None:
+                    health = {"p1": p1, "p2": p2, "d_p1": 0.0, "d_p2": 0.0}
+                else:
+                    health = {
+                        "p1": p1,
+                        "p2": p2,
+                        "d_p1": p1 - prev_health["p1"],
+                        "d_p2": p2 - prev_health["p2"],
+                    }
+
+                if prev_health is not None and prev_action is not None:
+                    reward = (prev_health["p2"] - health["p2"]) - (
+                        prev_health["p1"] - health["p1"]
+                    )
+                    line = _entry_line(
+                        datetime.now(timezone.utc).isoformat(),
+                        now - start,
+                        prev_health,
+                        prev_action,
+                        reward,
+                        health,
+                        screenshot_path,
+                    )
+                    with payload_path.open("a", encoding="utf-8") as handle:
+                        handle.write(line)
+
+                # choose action
+                action = next(decisions)
+
+                # apply action macro
+                state = _action_state(action)
+                macro_steps = max(1, int(round(args.action_seconds / macro_dt)))
+                for _ in range(macro_steps):
+                    _apply_state(gamepad, state)
+                    time.sleep(macro_dt)
+                _apply_state(gamepad, ActionState())
+
+                prev_health = health
+                prev_action = action
+                step += 1
+
+                next_tick += decision_dt
+                sleep_s = next_tick - time.perf_counter()
+                if sleep_s > 0:
+                    time.sleep(sleep_s)
+    finally:
+        # Flush queued screenshots even on Ctrl+C or an error in the loop.
+        screenshot_writer.close()
+        try:
+            if hasattr(gamepad, "reset"):
+                gamepad.reset()
+        except Exception:
+            pass
     return 0
 
 
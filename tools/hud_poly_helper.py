@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import argparse
 import ast
+import json
 import re
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
@@ -17,13 +18,25 @@ from runner.health_bar import P1_BAR_POLY_NORM, P2_BAR_POLY_NORM
 
 Point = Tuple[float, float]
 
+# Pixel offsets of a 7px ring drawn around each polygon vertex.
+_VERTEX_RING = tuple(
+    (dx, dy)
+    for dx in range(-3, 4)
+    for dy in range(-3, 4)
+    if 2 <= dx * dx + dy * dy <= 12
+)
+
 
 def _parse_points(raw: str) -> List[Point]:
     raw = raw.strip()
     if not raw:
         raise ValueError("No points provided.")
     if raw[0] in "[(":
-        parsed = ast.literal_eval(raw)
+        try:
+            parsed = json.loads(raw.replace("(", "[").replace(")", "]"))
+        except json.JSONDecodeError:
+            # Python-only spellings such as ".5" or trailing commas.
+            parsed = ast.literal_eval(raw)
         if not isinstance(parsed, (list, tuple)):
             raise ValueError("Expected a list/tuple of (x, y) pairs.")
         points: List[Point] = []
@@ -56,9 +69,8 @@ def _to_pixels(points_norm: Sequence[Point], width: int, height: int) -> List[Tu
 def _draw_poly(draw: ImageDraw.ImageDraw, points: Sequence[Tuple[int, int]], color: str) -> None:
     if not points:
         return
-    draw.line(list(points) + [points[0]], fill=color, width=3)
-    for x, y in points:
-        draw.ellipse((x - 3, y - 3, x + 3, y + 3), outline=color, width=2)
+    draw.polygon(list(points), outline=color, width=3)
+    draw.point([(x + dx, y + dy) for x, y in points for dx, dy in _VERTEX_RING], fill=color)
 
 
 def _overlay(args: argparse.Namespace) -> int:
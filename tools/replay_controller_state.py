@@ -3,7 +3,8 @@
 Replay a dense controller_state_XXhz.jsonl stream into a virtual Xbox 360 controller
 using vgamepad (ViGEm).
 
-Supports multiple vgamepad API variants by feature-detecting joystick/trigger methods.
+Frames are written straight into the pad's XUSB report struct when vgamepad exposes
+one; otherwise the int or *_float joystick/trigger setters are feature-detected.
 
 Example:
   python .\tools\replay_controller_state.py --jsonl "<path>/controller_state_60hz.jsonl" --hz 60 --duration 60
@@ -12,13 +13,25 @@ Example:
 from __future__ import annotations
 
 import argparse
+import bisect
+import ctypes
 import json
+import math
+import mmap
 import os
 import time
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import vgamepad as vg
 
+try:  # Optional faster JSON parser
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 
 # -----------------------------
 # Value scaling helpers
@@ -40,6 +53,13 @@ def _stick_float_to_int16(v: float) -> int:
     return int(round(v * 32767))
 
 
+def _stick_int16_to_float(v: int) -> float:
+    """
+    Inverse of _stick_float_to_int16 for float-only vgamepad builds.
+    """
+    return max(-1.0, v / 32767.0)
+
+
 def _trigger_float_to_uint8(v: float) -> int:
     """
     Convert float in [0, 1] to uint8 range [0, 255].
@@ -71,141 +91,488 @@ _DPAD_MAP = {
     "right": vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
 }
 
+# Parallel name/bit tuples for the per-frame mask build; the dicts above stay
+# for name-based lookups.
+_BUTTON_NAMES = tuple(_BUTTON_MAP)
+_BUTTON_BITS = tuple(int(btn) for btn in _BUTTON_MAP.values())
+_DPAD_NAMES = tuple(_DPAD_MAP)
+_DPAD_BITS = tuple(int(btn) for btn in _DPAD_MAP.values())
+_BIT_TO_BUTTON = {int(btn): btn for btn in (*_BUTTON_MAP.values(), *_DPAD_MAP.values())}
+_ALL_BUTTON_BITS = sum(_BIT_TO_BUTTON)
+
+
+_AXIS_NAMES = ("LS_X", "LS_Y", "RS_X", "RS_Y", "LT", "RT")
 
-def apply_frame(gamepad: vg.VX360Gamepad, device: Dict[str, Any]) -> None:
+
+def _device_mask(device: Dict[str, Any]) -> int:
     """
-    Apply one device frame to the virtual controller.
-    Expected keys:
-      - axes: LS_X, LS_Y, RS_X, RS_Y in [-1,1], LT/RT in [0,1]
-      - buttons: mapping of button name -> 0/1
-      - dpad: up/down/left/right -> 0/1
+    Fold a device's buttons/dpad mappings (values 0/1) into an XUSB bitmask.
     """
-    axes: Dict[str, Any] = device.get("axes", {}) or {}
     buttons: Dict[str, Any] = device.get("buttons", {}) or {}
     dpad: Dict[str, Any] = device.get("dpad", {}) or {}
+    mask = 0
+    for name, bit in zip(_BUTTON_NAMES, _BUTTON_BITS):
+        if buttons.get(name):
+            mask |= bit
+    for name, bit in zip(_DPAD_NAMES, _DPAD_BITS):
+        if dpad.get(name):
+            mask |= bit
+    return mask
+
 
-    lsx = float(axes.get("LS_X", 0.0))
-    lsy = float(axes.get("LS_Y", 0.0))
-    rsx = float(axes.get("RS_X", 0.0))
-    rsy = float(axes.get("RS_Y", 0.0))
-    lt = float(axes.get("LT", 0.0))
-    rt = float(axes.get("RT", 0.0))
+AxisAdapter = Tuple[
+    Callable[[float, float], None],
+    Callable[[float, float], None],
+    Callable[[float], None],
+    Callable[[float], None],
+]
 
+
+def build_adapter(gamepad: vg.VX360Gamepad) -> AxisAdapter:
+    """
+    Resolve the vgamepad joystick/trigger API variant once and return
+    (set_left_stick, set_right_stick, set_lt, set_rt) taking normalized floats.
+    """
     # --- Joysticks: support multiple vgamepad API variants ---
     # Variant A: left_joystick_float(x, y) and right_joystick_float(x, y)
     if hasattr(gamepad, "left_joystick_float") and hasattr(gamepad, "right_joystick_float"):
         # Many builds take positional args only.
-        gamepad.left_joystick_float(lsx, lsy)
-        gamepad.right_joystick_float(rsx, rsy)
+        set_left = gamepad.left_joystick_float
+        set_right = gamepad.right_joystick_float
 
     # Variant B: left_joystick(x, y) expecting int16, and right_joystick(x, y)
     elif hasattr(gamepad, "left_joystick") and hasattr(gamepad, "right_joystick"):
-        gamepad.left_joystick(_stick_float_to_int16(lsx), _stick_float_to_int16(lsy))
-        gamepad.right_joystick(_stick_float_to_int16(rsx), _stick_float_to_int16(rsy))
+
+        def set_left(x: float, y: float, _f=gamepad.left_joystick) -> None:
+            _f(_stick_float_to_int16(x), _stick_float_to_int16(y))
+
+        def set_right(x: float, y: float, _f=gamepad.right_joystick) -> None:
+            _f(_stick_float_to_int16(x), _stick_float_to_int16(y))
 
     else:
         raise RuntimeError("Unsupported vgamepad joystick API: no recognized joystick methods found.")
 
     # --- Triggers: support float or uint8 variants ---
     if hasattr(gamepad, "left_trigger_float") and hasattr(gamepad, "right_trigger_float"):
-        gamepad.left_trigger_float(_clamp(lt, 0.0, 1.0))
-        gamepad.right_trigger_float(_clamp(rt, 0.0, 1.0))
+
+        def set_lt(v: float, _f=gamepad.left_trigger_float) -> None:
+            _f(_clamp(v, 0.0, 1.0))
+
+        def set_rt(v: float, _f=gamepad.right_trigger_float) -> None:
+            _f(_clamp(v, 0.0, 1.0))
+
     elif hasattr(gamepad, "left_trigger") and hasattr(gamepad, "right_trigger"):
-        gamepad.left_trigger(_trigger_float_to_uint8(lt))
-        gamepad.right_trigger(_trigger_float_to_uint8(rt))
+
+        def set_lt(v: float, _f=gamepad.left_trigger) -> None:
+            _f(_trigger_float_to_uint8(v))
+
+        def set_rt(v: float, _f=gamepad.right_trigger) -> None:
+            _f(_trigger_float_to_uint8(v))
+
     else:
         raise RuntimeError("Unsupported vgamepad trigger API: no recognized trigger methods found.")
 
-    # --- Buttons ---
-    for name, btn_enum in _BUTTON_MAP.items():
-        pressed = int(buttons.get(name, 0)) == 1
-        if pressed:
-            gamepad.press_button(btn_enum)
-        else:
-            gamepad.release_button(btn_enum)
+    return set_left, set_right, set_lt, set_rt
+
 
-    # --- D-pad ---
-    for name, btn_enum in _DPAD_MAP.items():
-        pressed = int(dpad.get(name, 0)) == 1
-        if pressed:
-            gamepad.press_button(btn_enum)
+def _apply_buttons(gamepad: vg.VX360Gamepad, mask: int, prev_mask: Optional[int]) -> None:
+    changed = _ALL_BUTTON_BITS if prev_mask is None else mask ^ prev_mask
+    while changed:
+        bit = changed & -changed
+        if mask & bit:
+            gamepad.press_button(_BIT_TO_BUTTON[bit])
         else:
-            gamepad.release_button(btn_enum)
+            gamepad.release_button(_BIT_TO_BUTTON[bit])
+        changed ^= bit
+
+
+def apply_state(
+    gamepad: vg.VX360Gamepad,
+    axes: Sequence[float],
+    mask: int,
+    prev_mask: Optional[int],
+    adapter: AxisAdapter,
+) -> int:
+    """
+    Apply normalized axes (in _AXIS_NAMES order) and a button bitmask, then commit.
+    Returns ``mask`` so callers can feed it back as the next ``prev_mask``.
+    """
+    set_left, set_right, set_lt, set_rt = adapter
+    lsx, lsy, rsx, rsy, lt, rt = axes
+    set_left(lsx, lsy)
+    set_right(rsx, rsy)
+    set_lt(lt)
+    set_rt(rt)
+    _apply_buttons(gamepad, mask, prev_mask)
 
     # Commit update to driver
     gamepad.update()
+    return mask
+
+
+def _new_sent_state() -> List[Optional[int]]:
+    """
+    Last values sent to the pad: LS_X, LS_Y, RS_X, RS_Y, LT, RT, button mask.
+    ``None`` means "never sent", which forces the first write.
+    """
+    return [None] * 7
+
+
+def _moved(prev: Optional[int], value: int, epsilon: int) -> bool:
+    return prev is None or abs(value - prev) > epsilon
+
+
+def _gamepad_report(gamepad: vg.VX360Gamepad) -> Any:
+    """
+    Return the gamepad's XUSB_REPORT struct if it exposes one, else None.
+
+    vgamepad's setters only assign fields on this struct; update() is what sends
+    it to the driver, so writing the fields directly is equivalent.
+    """
+    report = getattr(gamepad, "report", None)
+    if report is None or not hasattr(report, "wButtons"):
+        return None
+    return report
+
+
+def make_fast_update(gamepad: vg.VX360Gamepad) -> Callable[[], None]:
+    """
+    Return a zero-argument sender for the gamepad's current report.
+
+    On Windows this binds ViGEmClient's vigem_target_x360_update with the pad's
+    bus/device handles and report struct, so each send is a single ctypes call
+    without vgamepad's update() wrapper. Falls back to gamepad.update when those
+    internals are not available. Call again after gamepad.reset(), which
+    replaces the report struct.
+    """
+    report = _gamepad_report(gamepad)
+    busp = getattr(gamepad, "_busp", None)
+    devicep = getattr(gamepad, "_devicep", None)
+    if report is None or busp is None or devicep is None:
+        return gamepad.update
+    try:
+        from vgamepad.win import vigem_client as vcli
+        from vgamepad.win.vigem_commons import VIGEM_ERRORS
+    except Exception:
+        return gamepad.update
+
+    send = vcli.vigem_target_x360_update
+    ok = int(VIGEM_ERRORS.VIGEM_ERROR_NONE)
+
+    def fast_update() -> None:
+        err = send(busp, devicep, report)
+        if err != ok:
+            raise RuntimeError(f"vigem_target_x360_update failed: {VIGEM_ERRORS(err).name}")
+
+    return fast_update
+
+
+def _int_axis_setters(
+    gamepad: vg.VX360Gamepad,
+) -> Tuple[
+    Callable[[int, int], None],
+    Callable[[int, int], None],
+    Callable[[int], None],
+    Callable[[int], None],
+]:
+    """
+    Resolve (left_stick, right_stick, lt, rt) setters taking Frame ints: int16
+    sticks and uint8 triggers. The int vgamepad methods are bound as-is; builds
+    exposing only the *_float variants get them wrapped with the inverse scaling.
+    """
+    if hasattr(gamepad, "left_joystick") and hasattr(gamepad, "right_joystick"):
+        set_left = gamepad.left_joystick
+        set_right = gamepad.right_joystick
+    elif hasattr(gamepad, "left_joystick_float") and hasattr(gamepad, "right_joystick_float"):
+
+        def set_left(x: int, y: int, _f=gamepad.left_joystick_float) -> None:
+            _f(_stick_int16_to_float(x), _stick_int16_to_float(y))
+
+        def set_right(x: int, y: int, _f=gamepad.right_joystick_float) -> None:
+            _f(_stick_int16_to_float(x), _stick_int16_to_float(y))
+
+    else:
+        raise RuntimeError("Unsupported vgamepad joystick API: no recognized joystick methods found.")
+
+    if hasattr(gamepad, "left_trigger") and hasattr(gamepad, "right_trigger"):
+        set_lt = gamepad.left_trigger
+        set_rt = gamepad.right_trigger
+    elif hasattr(gamepad, "left_trigger_float") and hasattr(gamepad, "right_trigger_float"):
+
+        def set_lt(v: int, _f=gamepad.left_trigger_float) -> None:
+            _f(v / 255.0)
+
+        def set_rt(v: int, _f=gamepad.right_trigger_float) -> None:
+            _f(v / 255.0)
+
+    else:
+        raise RuntimeError("Unsupported vgamepad trigger API: no recognized trigger methods found.")
+
+    return set_left, set_right, set_lt, set_rt
+
+
+# Flat per-frame state shared by the replay and smoke paths:
+# (LS_X, LS_Y, RS_X, RS_Y) int16, (LT, RT) uint8, XUSB button mask.
+Frame = Tuple[int, int, int, int, int, int, int]
+
+RowWriter = Callable[[Frame, List[Optional[int]]], bool]
+
+
+def make_row_writer(
+    gamepad: vg.VX360Gamepad,
+    stick_epsilon: int = 0,
+    trigger_epsilon: int = 0,
+) -> RowWriter:
+    """
+    Return ``write(row, sent) -> dirty`` specialized for this gamepad.
+
+    ``row`` is a Frame: int16 sticks LS_X, LS_Y, RS_X, RS_Y, uint8 triggers LT,
+    RT and the button bitmask. Fields within epsilon of
+    what was last sent (tracked in ``sent``, see _new_sent_state) are skipped;
+    the driver keeps prior state.
+
+    If the gamepad exposes its XUSB_REPORT, fields are written into it directly;
+    otherwise the setters from _int_axis_setters are used. The choice is made
+    here once, so the per-frame call has no variant branches. The writer does not call
+    gamepad.update(); it returns True if anything was staged.
+    """
+    report = _gamepad_report(gamepad)
+
+    if report is not None:
+
+        def write(row: Frame, sent: List[Optional[int]]) -> bool:
+            lsx, lsy, rsx, rsy, lt, rt, mask = row
+            dirty = mask != sent[6]
+            if _moved(sent[0], lsx, stick_epsilon) or _moved(sent[1], lsy, stick_epsilon):
+                report.sThumbLX = lsx
+                report.sThumbLY = lsy
+                sent[0], sent[1] = lsx, lsy
+                dirty = True
+            if _moved(sent[2], rsx, stick_epsilon) or _moved(sent[3], rsy, stick_epsilon):
+                report.sThumbRX = rsx
+                report.sThumbRY = rsy
+                sent[2], sent[3] = rsx, rsy
+                dirty = True
+            if _moved(sent[4], lt, trigger_epsilon):
+                report.bLeftTrigger = lt
+                sent[4] = lt
+                dirty = True
+            if _moved(sent[5], rt, trigger_epsilon):
+                report.bRightTrigger = rt
+                sent[5] = rt
+                dirty = True
+            report.wButtons = mask
+            sent[6] = mask
+            return dirty
+
+        return write
+
+    left_joystick, right_joystick, left_trigger, right_trigger = _int_axis_setters(gamepad)
+
+    def write(row: Frame, sent: List[Optional[int]]) -> bool:
+        lsx, lsy, rsx, rsy, lt, rt, mask = row
+        dirty = mask != sent[6]
+        if _moved(sent[0], lsx, stick_epsilon) or _moved(sent[1], lsy, stick_epsilon):
+            left_joystick(lsx, lsy)
+            sent[0], sent[1] = lsx, lsy
+            dirty = True
+        if _moved(sent[2], rsx, stick_epsilon) or _moved(sent[3], rsy, stick_epsilon):
+            right_joystick(rsx, rsy)
+            sent[2], sent[3] = rsx, rsy
+            dirty = True
+        if _moved(sent[4], lt, trigger_epsilon):
+            left_trigger(lt)
+            sent[4] = lt
+            dirty = True
+        if _moved(sent[5], rt, trigger_epsilon):
+            right_trigger(rt)
+            sent[5] = rt
+            dirty = True
+        _apply_buttons(gamepad, mask, sent[6])
+        sent[6] = mask
+        return dirty
+
+    return write
 
 
 def iter_jsonl(path: str) -> Iterable[Dict[str, Any]]:
     """
     Yield JSON objects line-by-line from a JSONL file.
+
+    The file is memory-mapped and split on newline bytes directly, so lines go
+    to the JSON parser as bytes without a text-decoding/line-buffering layer.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                nl = find(b"\n", pos)
+                if nl < 0:
+                    nl = size
+                line = mm[pos:nl].strip()
+                if line:
+                    yield _json_loads(line)
+                pos = nl + 1
+
+
+def _preload_jsonl(
+    path: str,
+    start_seconds: Optional[float] = None,
+    max_rows: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse the JSONL stream up front into structure-of-arrays form so the
+    realtime loop only indexes rows.
+
+    Returns (t_run_s[N] float64, axes[N, 6] float64 in _AXIS_NAMES order,
+    button_mask[N] uint32) for the first device of every frame that has one.
+    Frames before start_seconds are dropped without decoding their device, and
+    parsing stops once max_rows rows are kept (0 = no limit).
+    """
+    t_run: List[float] = []
+    axes: List[Tuple[float, ...]] = []
+    masks: List[int] = []
+    for obj in iter_jsonl(path):
+        devices = obj.get("devices") or []
+        if not devices:
+            continue
+        t = float(obj.get("t_run_s", 0.0))
+        if start_seconds is not None and t < start_seconds:
+            continue
+        device = devices[0]
+        dev_axes = device.get("axes", {}) or {}
+        t_run.append(t)
+        axes.append(tuple(float(dev_axes.get(name, 0.0)) for name in _AXIS_NAMES))
+        masks.append(_device_mask(device))
+        if max_rows and len(masks) >= max_rows:
+            break
+    return (
+        np.array(t_run, dtype=np.float64),
+        np.array(axes, dtype=np.float64).reshape(-1, len(_AXIS_NAMES)),
+        np.array(masks, dtype=np.uint32),
+    )
+
+
+def _quantize_axes(axes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized _stick_float_to_int16 / _trigger_float_to_uint8 over preloaded axes.
+    Computed in float64 like the scalar helpers; float32 products round to a
+    different int16 on a small fraction of inputs.
+    """
+    axes = np.asarray(axes, dtype=np.float64)
+    raw_sticks = axes[:, :4]
+    sticks = np.rint(np.clip(raw_sticks, -1.0, 1.0) * 32767.0)
+    sticks[raw_sticks <= -1.0] = -32768
+    triggers = np.rint(np.clip(axes[:, 4:], 0.0, 1.0) * 255.0)
+    return sticks.astype(np.int16), triggers.astype(np.uint8)
+
+
+def _plan_replay(sticks: np.ndarray, triggers: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """
+    Pack preloaded (already start/duration-filtered) rows into one (N, 7) int64
+    schedule of Frame rows: LS_X, LS_Y, RS_X, RS_Y, LT, RT, button mask. Frame k is due at
+    t0_ns + (k + 1) * dt_ns, so no per-row bookkeeping is left for the dispatch loop.
+    """
+    plan = np.empty((len(masks), 7), dtype=np.int64)
+    plan[:, :4] = sticks
+    plan[:, 4:6] = triggers
+    plan[:, 6] = masks
+    return plan
+
+
+# -----------------------------
+# Cadence helpers
+# -----------------------------
+_NS_PER_S = 1_000_000_000
+_SPIN_MARGIN_NS = 2_000_000
+
+
+def _precise_sleep_until(deadline_ns: int) -> int:
+    """
+    Wait until ``deadline_ns`` (time.perf_counter_ns). Coarse time.sleep covers
+    all but the last _SPIN_MARGIN_NS, which is busy-waited to avoid the 1-15 ms
+    sleep granularity on Windows. Returns the nanoseconds spent waiting.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
+    start = time.perf_counter_ns()
+    while (remaining := deadline_ns - time.perf_counter_ns()) > _SPIN_MARGIN_NS:
+        time.sleep((remaining - _SPIN_MARGIN_NS // 2) / _NS_PER_S)
+    while time.perf_counter_ns() < deadline_ns:
+        pass
+    return time.perf_counter_ns() - start
+
+
+def _set_timer_resolution(enable: bool) -> None:
+    """
+    Request (or release) 1 ms system timer resolution on Windows; no-op elsewhere.
+    """
+    if os.name != "nt":
+        return
+    try:
+        winmm = ctypes.WinDLL("winmm")
+        if enable:
+            winmm.timeBeginPeriod(1)
+        else:
+            winmm.timeEndPeriod(1)
+    except (AttributeError, OSError):
+        pass
 
 
 def _latest_run_jsonl(base_dir: str = "runner_artifacts") -> Optional[str]:
     if not os.path.isdir(base_dir):
         return None
-    runs = [
-        os.path.join(base_dir, name)
-        for name in os.listdir(base_dir)
-        if os.path.isdir(os.path.join(base_dir, name))
-    ]
+    # scandir entries carry the type (and on Windows the stat) from the listing.
+    with os.scandir(base_dir) as it:
+        runs = [(entry.stat().st_mtime, entry.path) for entry in it if entry.is_dir()]
     if not runs:
         return None
-    runs.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-    candidate = os.path.join(runs[0], "inputs", "controller_state_60hz.jsonl")
+    latest = max(runs)[1]
+    candidate = os.path.join(latest, "inputs", "controller_state_60hz.jsonl")
     return candidate
 
 
-def _neutral_device() -> Dict[str, Any]:
-    return {
-        "axes": {"LS_X": 0.0, "LS_Y": 0.0, "RS_X": 0.0, "RS_Y": 0.0, "LT": 0.0, "RT": 0.0},
-        "buttons": {name: 0 for name in _BUTTON_MAP.keys()},
-        "dpad": {name: 0 for name in _DPAD_MAP.keys()},
-    }
-
-
-def _smoke_state(cycle_time: float, last_punch_index: Optional[int]) -> Tuple[Dict[str, Any], Optional[int]]:
-    segments = [
-        ("idle", 1.0),
-        ("walk_right", 2.0),
-        ("neutral", 0.5),
-        ("punch", 2.0),
-        ("crouch", 1.0),
-        ("block", 1.5),
-    ]
-    total = sum(duration for _, duration in segments)
-    t = cycle_time % total
-
-    state = _neutral_device()
-    for name, duration in segments:
-        if t <= duration:
-            segment_time = t
-            break
-        t -= duration
-    else:
-        name = "idle"
-        segment_time = 0.0
+_NEUTRAL_FRAME: Frame = (0, 0, 0, 0, 0, 0, 0)
+_WALK_RIGHT_FRAME: Frame = (_stick_float_to_int16(0.6), 0, 0, 0, 0, 0, 0)
+_CROUCH_FRAME: Frame = (0, _stick_float_to_int16(-0.6), 0, 0, 0, 0, 0)
+_BLOCK_FRAME: Frame = (_stick_float_to_int16(-0.6), 0, 0, 0, 0, 0, 0)
+_PUNCH_FRAME: Frame = (0, 0, 0, 0, 0, 0, int(_BUTTON_MAP["X"]))
+
+# Smoke cycle: idle 1.0s, walk_right 2.0s, neutral 0.5s, punch 2.0s, crouch 1.0s, block 1.5s.
+_SEG_NAMES = ("idle", "walk_right", "neutral", "punch", "crouch", "block")
+_SEG_ENDS = (1.0, 3.0, 3.5, 5.5, 6.5, 8.0)
+_SEG_TOTAL = _SEG_ENDS[-1]
+
+
+def _smoke_state(
+    cycle_time: float, last_punch_index: Optional[int]
+) -> Tuple[Frame, Optional[int]]:
+    """
+    Return (frame, last_punch_index) for the deterministic smoke pattern at
+    ``cycle_time``. Frames are the shared module-level constants above.
+    """
+    t = cycle_time % _SEG_TOTAL
+    # bisect_left keeps segment ends inclusive, e.g. t == 1.0 is still "idle".
+    idx = bisect.bisect_left(_SEG_ENDS, t)
+    name = _SEG_NAMES[idx]
+    segment_time = t - (_SEG_ENDS[idx - 1] if idx else 0.0)
 
+    frame = _NEUTRAL_FRAME
     if name == "walk_right":
-        state["axes"]["LS_X"] = 0.6
+        frame = _WALK_RIGHT_FRAME
     elif name == "punch":
         punch_index = int(segment_time / 0.5)
         if punch_index != last_punch_index and segment_time < 2.0:
-            state["buttons"]["X"] = 1
+            frame = _PUNCH_FRAME
             last_punch_index = punch_index
     elif name == "crouch":
-        state["axes"]["LS_Y"] = -0.6
+        frame = _CROUCH_FRAME
     elif name == "block":
-        state["axes"]["LS_X"] = -0.6
+        frame = _BLOCK_FRAME
 
-    return state, last_punch_index
+    return frame, last_punch_index
 
 
 def run_replay(args: argparse.Namespace, gamepad: vg.VX360Gamepad) -> int:
@@ -216,54 +583,56 @@ def run_replay(args: argparse.Namespace, gamepad: vg.VX360Gamepad) -> int:
     hz = float(args.hz)
     if hz <= 0:
         raise SystemExit("--hz must be > 0")
-    dt = 1.0 / hz
+    # Integer nanosecond cadence: frame deadlines are exact multiples, no drift.
+    dt_ns = max(1, round(_NS_PER_S / hz))
 
     duration = float(args.duration)
+    keepalive = max(0, int(args.keepalive_frames))
     start_seconds = float(args.start_seconds)
-
-    t0 = time.perf_counter()
-    last_stats = t0
+    axis_epsilon = max(0.0, float(args.axis_epsilon))
+    stick_epsilon = int(round(axis_epsilon * 32767))
+    trigger_epsilon = int(round(axis_epsilon * 255))
+    max_frames = int(math.ceil(duration * hz)) if duration > 0 else 0
+    _, axes, masks = _preload_jsonl(jsonl_path, start_seconds, max_frames)
+    sticks, triggers = _quantize_axes(axes)
+    # Plain Python ints for the ctypes setters, converted once up front.
+    plan = _plan_replay(sticks, triggers, masks)
+    rows: List[Frame] = [tuple(row) for row in plan.tolist()]
+
+    duration_ns = round(duration * _NS_PER_S)
+    stats_every_ns = round(float(args.stats_every) * _NS_PER_S)
+    t0_ns = time.perf_counter_ns()
+    last_stats_ns = t0_ns
     frames = 0
-    slept_total = 0.0
-
-    for obj in iter_jsonl(jsonl_path):
-        # Skip until start_seconds
-        t_run_s = float(obj.get("t_run_s", 0.0))
-        if t_run_s < start_seconds:
-            continue
-
-        now = time.perf_counter()
-        elapsed = now - t0
+    slept_ns = 0
+    sent = _new_sent_state()
+    write_row = make_row_writer(gamepad, stick_epsilon, trigger_epsilon)
+    send = make_fast_update(gamepad)
 
-        if duration > 0 and elapsed >= duration:
+    for row in rows:
+        if duration > 0 and (time.perf_counter_ns() - t0_ns) >= duration_ns:
             break
 
-        devices = obj.get("devices") or []
-        if not devices:
-            continue
-
         # Apply first device
-        apply_frame(gamepad, devices[0])
+        dirty = write_row(row, sent)
+        # ViGEm keeps the last report; unchanged frames only get a periodic resend.
+        if dirty or (keepalive and frames % keepalive == 0):
+            send()
         frames += 1
 
         # Cadence control (best-effort)
-        target_next = t0 + frames * dt
-        after = time.perf_counter()
-        sleep_s = target_next - after
-        if sleep_s > 0:
-            time.sleep(sleep_s)
-            slept_total += sleep_s
+        slept_ns += _precise_sleep_until(t0_ns + frames * dt_ns)
 
         # Periodic stats
-        now2 = time.perf_counter()
-        if (now2 - last_stats) >= float(args.stats_every):
-            real_elapsed = now2 - t0
+        now_ns = time.perf_counter_ns()
+        if (now_ns - last_stats_ns) >= stats_every_ns:
+            real_elapsed = (now_ns - t0_ns) / _NS_PER_S
             actual_hz = frames / real_elapsed if real_elapsed > 0 else 0.0
             print(
                 f"[replay] frames={frames} elapsed={real_elapsed:.2f}s "
-                f"actual_hz={actual_hz:.2f} slept={slept_total:.2f}s"
+                f"actual_hz={actual_hz:.2f} slept={slept_ns / _NS_PER_S:.2f}s"
             )
-            last_stats = now2
+            last_stats_ns = now_ns
 
     return 0
 
@@ -272,44 +641,55 @@ def run_smoke(args: argparse.Namespace, gamepad: vg.VX360Gamepad) -> int:
     hz = float(args.hz)
     if hz <= 0:
         raise SystemExit("--hz must be > 0")
-    dt = 1.0 / hz
+    # Integer nanosecond cadence: frame deadlines are exact multiples, no drift.
+    dt_ns = max(1, round(_NS_PER_S / hz))
 
     duration = float(args.duration)
     if duration <= 0:
         raise SystemExit("--duration must be > 0 in smoke mode")
+    keepalive = max(0, int(args.keepalive_frames))
 
-    t0 = time.perf_counter()
-    last_stats = t0
+    duration_ns = round(duration * _NS_PER_S)
+    stats_every_ns = round(float(args.stats_every) * _NS_PER_S)
+    t0_ns = time.perf_counter_ns()
+    last_stats_ns = t0_ns
     frames = 0
-    slept_total = 0.0
+    slept_ns = 0
     last_punch_index: Optional[int] = None
+    last_frame: Optional[Frame] = None
+    sent = _new_sent_state()
+    write_row = make_row_writer(gamepad)
+    send = make_fast_update(gamepad)
 
     while True:
-        now = time.perf_counter()
-        elapsed = now - t0
-        if elapsed >= duration:
+        elapsed_ns = time.perf_counter_ns() - t0_ns
+        if elapsed_ns >= duration_ns:
             break
-
-        device, last_punch_index = _smoke_state(elapsed, last_punch_index)
-        apply_frame(gamepad, device)
+        elapsed = elapsed_ns / _NS_PER_S
+
+        frame, last_punch_index = _smoke_state(elapsed, last_punch_index)
+        # ViGEm keeps the last report, so identical frames need no driver traffic.
+        # _smoke_state returns shared module-level frames, so identity is enough
+        # to detect a segment change.
+        if frame is not last_frame:
+            write_row(frame, sent)
+            send()
+            last_frame = frame
+        elif keepalive and frames % keepalive == 0:
+            send()
         frames += 1
 
-        target_next = t0 + frames * dt
-        after = time.perf_counter()
-        sleep_s = target_next - after
-        if sleep_s > 0:
-            time.sleep(sleep_s)
-            slept_total += sleep_s
+        slept_ns += _precise_sleep_until(t0_ns + frames * dt_ns)
 
-        now2 = time.perf_counter()
-        if (now2 - last_stats) >= float(args.stats_every):
-            real_elapsed = now2 - t0
+        now_ns = time.perf_counter_ns()
+        if (now_ns - last_stats_ns) >= stats_every_ns:
+            real_elapsed = (now_ns - t0_ns) / _NS_PER_S
             actual_hz = frames / real_elapsed if real_elapsed > 0 else 0.0
             print(
                 f"[smoke] frames={frames} elapsed={real_elapsed:.2f}s "
-                f"actual_hz={actual_hz:.2f} slept={slept_total:.2f}s"
+                f"actual_hz={actual_hz:.2f} slept={slept_ns / _NS_PER_S:.2f}s"
             )
-            last_stats = now2
+            last_stats_ns = now_ns
 
     return 0
 
@@ -327,9 +707,22 @@ def main() -> int:
     parser.add_argument("--duration", type=float, default=60.0, help="Duration seconds (0 = play entire file)")
     parser.add_argument("--start-seconds", type=float, default=0.0, help="Skip frames where t_run_s < start-seconds")
     parser.add_argument("--stats-every", type=float, default=2.0, help="Print stats every N seconds")
+    parser.add_argument(
+        "--axis-epsilon",
+        type=float,
+        default=0.0,
+        help="Replay only: skip stick/trigger writes that moved by <= this much (normalized units)",
+    )
+    parser.add_argument(
+        "--keepalive-frames",
+        type=int,
+        default=10,
+        help="Resend an unchanged report every N frames (0 = only send on change)",
+    )
     args = parser.parse_args()
 
     gamepad = vg.VX360Gamepad()
+    _set_timer_resolution(True)
 
     try:
         if args.mode == "smoke":
@@ -357,6 +750,7 @@ def main() -> int:
             )
         return run_replay(args, gamepad)
     finally:
+        _set_timer_resolution(False)
         # Release everything on exit so we don't “stick” inputs
         try:
             # Best-effort neutral reset
@@ -364,25 +758,8 @@ def main() -> int:
                 gamepad.reset()
             else:
                 # Manual neutral: zero sticks/triggers & release buttons
-                if hasattr(gamepad, "left_joystick_float") and hasattr(gamepad, "right_joystick_float"):
-                    gamepad.left_joystick_float(0.0, 0.0)
-                    gamepad.right_joystick_float(0.0, 0.0)
-                elif hasattr(gamepad, "left_joystick") and hasattr(gamepad, "right_joystick"):
-                    gamepad.left_joystick(0, 0)
-                    gamepad.right_joystick(0, 0)
-
-                if hasattr(gamepad, "left_trigger_float") and hasattr(gamepad, "right_trigger_float"):
-                    gamepad.left_trigger_float(0.0)
-                    gamepad.right_trigger_float(0.0)
-                elif hasattr(gamepad, "left_trigger") and hasattr(gamepad, "right_trigger"):
-                    gamepad.left_trigger(0)
-                    gamepad.right_trigger(0)
-
-                for btn in _BUTTON_MAP.values():
-                    gamepad.release_button(btn)
-                for btn in _DPAD_MAP.values():
-                    gamepad.release_button(btn)
-                gamepad.update()
+                neutral_axes = (0.0,) * len(_AXIS_NAMES)
+                apply_state(gamepad, neutral_axes, 0, None, build_adapter(gamepad))
         except Exception:
             pass
 
@@ -3,15 +3,18 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import os
+import queue
 import random
 import signal
 import sys
 import time
+import zlib
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Deque, Dict, List, Optional, Tuple
 
@@ -25,18 +28,41 @@ except ImportError:  # pragma: no cover - optional feature
 
 try:  # Optional dependency for screenshot capture
     import mss  # type: ignore
-    from mss import tools as mss_tools  # type: ignore
 except ImportError:  # pragma: no cover - environment specific
     mss = None  # type: ignore
-    mss_tools = None  # type: ignore
+
+try:  # Optional dependency for HUD debug snapshots and tiny-frame resizing
+    from PIL import Image, ImageDraw  # type: ignore
+except ImportError:  # pragma: no cover - environment specific
+    Image = ImageDraw = None  # type: ignore
+
+try:  # Optional dependency for fast JSON encoding
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    orjson = None  # type: ignore
+
+try:  # Optional dependency for fast frame hashing
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    xxhash = None  # type: ignore
+
+try:  # Optional dependency for SIMD frame downsampling
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    cv2 = None  # type: ignore
+
+try:  # Optional dependency for JIT-compiled frame math
+    from numba import njit, prange  # type: ignore
+except ImportError:  # pragma: no cover - optional feature
+    njit = prange = None  # type: ignore
 
 from agent.action_set import ACTIONS, Action, action_names, apply_action, get_action, release_all
-from agent.q_learner import QLearner
+from agent.q_learner import QLearner, write_policy
 from agent.reward import DEFAULT_IDLE_PENALTY, net_advantage
-from agent.state import make_state
+from agent.state import state_buckets, state_key
 from reporting.training_report import generate_report
 from runner.target_detect import lock_target
-from runner.capture import _find_window_rect  # type: ignore
+from runner.capture import BackgroundGrabber, BackgroundScreenshotWriter, _find_window_rect  # type: ignore
 
 if os.name == "nt":  # pragma: no cover - Windows-only helpers
     import ctypes
@@ -50,6 +76,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--decision-hz", type=float, default=10.0)
     parser.add_argument("--action-hold-ticks", type=int, default=6)
     parser.add_argument("--policy-path", default="policies/q_table.json")
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=5,
+        help="Save the policy every N episodes; it is always saved on exit.",
+    )
     parser.add_argument("--report-path", default="")
     parser.add_argument("--target-exe", default="StreetFighter6.exe")
     parser.add_argument("--target-lock-seconds", type=int, default=10)
@@ -59,12 +91,20 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--screenshot-interval",
         type=int,
-        default=1,
+        default=5,
         help=(
-            "Save a screenshot every N decisions (<=0 disables screenshots entirely). "
+            "Save a screenshot every N decisions, plus on scene changes and "
+            "whenever a health bar drops "
+            "(<=0 disables screenshots entirely). "
             "Lower values capture more detail but add I/O overhead."
         ),
     )
+    parser.add_argument(
+        "--screenshot-format",
+        choices=["jpg", "webp", "png"],
+        default="jpg",
+        help="Screenshot encoding; jpg/webp (quality 85) are much cheaper than png.",
+    )
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--no-vision", action="store_true")
     parser.add_argument("--debug-buttons", action="store_true")
@@ -156,12 +196,6 @@ def _capture_region(target_pid: Optional[int], capture_mode: str) -> dict:
     return {}
 
 
-def _save_screenshot(rgb_bytes: bytes, size: tuple, path: Path) -> None:
-    if mss_tools is None:
-        return
-    mss_tools.to_png(rgb_bytes, size, output=str(path))  # type: ignore[arg-type]
-
-
 def _enable_dpi_awareness() -> str:
     if os.name != "nt":
         return "non-windows"
@@ -308,6 +342,19 @@ def _parse_poly(raw: str, fallback: list[tuple[float, float]]) -> list[tuple[flo
     return [(values[i], values[i + 1]) for i in range(0, 8, 2)]
 
 
+@lru_cache(maxsize=8)
+def _roi_px(
+    roi_norm: Tuple[float, float, float, float], width: int, height: int
+) -> Tuple[int, int, int, int]:
+    """Pixel box for a normalized ROI; cached per frame size."""
+    return (
+        int(roi_norm[0] * width),
+        int(roi_norm[1] * height),
+        int(roi_norm[2] * width),
+        int(roi_norm[3] * height),
+    )
+
+
 def _apply_y_offset(
     roi_px: Tuple[int, int, int, int],
     *,
@@ -322,51 +369,266 @@ def _apply_y_offset(
     return x1, y1, x2, y2
 
 
-def _downsample_gray_bytes(frame: bytes, size: Tuple[int, int], target: Tuple[int, int]) -> bytes:
-    from PIL import Image  # type: ignore
+def _jsonl_line(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
 
-    image = Image.frombytes("RGB", size, frame)
+
+@lru_cache(maxsize=4)
+def _utc_iso_seconds(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _utc_iso(ns: int) -> str:
+    """``datetime.isoformat()``-style UTC timestamp for ``time.time_ns()``.
+
+    The date/time prefix is formatted once per second; ticks only append the
+    microseconds.
+    """
+    seconds, rem = divmod(ns, 1_000_000_000)
+    return f"{_utc_iso_seconds(seconds)}.{rem // 1000:06d}+00:00"
+
+
+def _json_pretty(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+def _shift_rows(frame: np.ndarray, offset_px: int) -> np.ndarray:
+    """Translate frame rows down by ``offset_px`` (up if negative), zero-filling
+    the uncovered rows; same result as PIL's integer AFFINE shift."""
+    if not offset_px:
+        return frame
+    shifted = np.zeros_like(frame)
+    if abs(offset_px) < frame.shape[0]:
+        if offset_px > 0:
+            shifted[offset_px:] = frame[:-offset_px]
+        else:
+            shifted[:offset_px] = frame[-offset_px:]
+    return shifted
+
+
+def _downsample_gray_bytes(raw: bytes, size: Tuple[int, int], target: Tuple[int, int]) -> bytes:
+    if Image is None:
+        raise RuntimeError("Pillow is required to downsample frames smaller than 64x36.")
+    # Decode mss's BGRA buffer directly instead of building packed RGB first.
+    image = Image.frombytes("RGB", size, raw, "raw", "BGRX")
     gray = image.convert("L").resize(target)
     return gray.tobytes()
 
 
-def _screen_delta(prev_bytes: bytes, curr_bytes: bytes) -> float:
-    if not prev_bytes or not curr_bytes or len(prev_bytes) != len(curr_bytes):
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _sad_u8(a, b):  # pragma: no cover - compiled
+        total = 0
+        for i in range(a.shape[0]):
+            d = int(a[i]) - int(b[i])
+            total += -d if d < 0 else d
+        return total
+
+    @njit(cache=True, parallel=True)
+    def _gray_pool_u8(bgra, target_h, target_w, block_h, block_w):  # pragma: no cover - compiled
+        # Same integer math as the NumPy path: weighted block sums, floor-divided.
+        out = np.empty(target_h * target_w, dtype=np.uint8)
+        scale = 256 * block_h * block_w
+        for cell in prange(target_h * target_w):
+            y0 = (cell // target_w) * block_h
+            x0 = (cell % target_w) * block_w
+            total = 0
+            for y in range(y0, y0 + block_h):
+                for x in range(x0, x0 + block_w):
+                    total += (
+                        29 * np.int64(bgra[y, x, 0])
+                        + 150 * np.int64(bgra[y, x, 1])
+                        + 77 * np.int64(bgra[y, x, 2])
+                    )
+            out[cell] = total // scale
+        return out
+
+else:
+    _sad_u8 = None
+    _gray_pool_u8 = None
+
+
+def _warm_frame_kernels(target: Tuple[int, int]) -> None:
+    """Compile the JIT kernels (if any) before the first episode starts."""
+    target_w, target_h = target
+    if _sad_u8 is not None:
+        frame = np.zeros(target_w * target_h, dtype=np.uint8)
+        _sad_u8(frame, frame)
+    if _gray_pool_u8 is not None:
+        # Numba specializes on writability and layout. CapturedFrame.bgra is
+        # a writable C-contiguous view (mss hands back a bytearray), so warm
+        # that exact array type or the first live tick compiles again.
+        raw = bytearray(target_w * target_h * 4)
+        bgra = np.frombuffer(raw, dtype=np.uint8).reshape(target_h, target_w, 4)
+        _gray_pool_u8(bgra, target_h, target_w, 1, 1)
+
+
+# BT.601 luma weights in BGRA order, 8-bit fixed point (sum to 256); alpha ignored.
+_GRAY_WEIGHTS_BGRA = np.array([29, 150, 77, 0], dtype=np.uint32)
+# cv2.integral's int32 sums hold 255 * pixels per channel up to about 8.4 MP
+# (a 4K frame); larger captures use the NumPy pool.
+_CV2_INTEGRAL_MAX_PX = (2**31 - 1) // 255
+
+
+def _downsample_gray(bgra: np.ndarray, target: Tuple[int, int]) -> np.ndarray:
+    """Block-mean gray downsample of an (H, W, 4) BGRA frame to ``target`` (W, H).
+
+    Returns the flattened uint8 pixels. Uses the Numba kernel when available,
+    then OpenCV's integral image, then NumPy, all with the same integer weights
+    so the result doesn't depend on which is installed; frames smaller than the
+    target fall back to the PIL resize.
+    """
+    target_w, target_h = target
+    height, width = bgra.shape[:2]
+    block_h, block_w = height // target_h, width // target_w
+    if not block_h or not block_w:
+        raw = _downsample_gray_bytes(bgra.tobytes(), (width, height), target)
+        return np.frombuffer(raw, dtype=np.uint8)
+    if _gray_pool_u8 is not None:
+        return _gray_pool_u8(bgra, target_h, target_w, block_h, block_w)
+    cropped = bgra[: target_h * block_h, : target_w * block_w]
+    if cv2 is not None and cropped.shape[0] * cropped.shape[1] <= _CV2_INTEGRAL_MAX_PX:
+        # Exact per-channel block sums from the integral image's block corners,
+        # so the gray values below match the other paths bit for bit.
+        corners = cv2.integral(cropped, sdepth=cv2.CV_32S)[::block_h, ::block_w]
+        sums = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+    else:
+        # Pool rows, then columns (one contiguous reduction each).
+        rows = cropped.reshape(target_h, block_h, target_w * block_w, 4)
+        rows = rows.sum(axis=1, dtype=np.uint32)
+        sums = rows.reshape(target_h, target_w, block_w, 4).sum(axis=2)
+    # Weight the small (target_h, target_w, 4) block sums.
+    gray = (sums @ _GRAY_WEIGHTS_BGRA) // (256 * block_h * block_w)
+    return gray.astype(np.uint8).ravel()
+
+
+def _screen_delta(
+    prev: Optional[np.ndarray], curr: np.ndarray, scratch: Optional[np.ndarray] = None
+) -> float:
+    """Mean absolute difference of two uint8 gray frames, normalized to 0..1."""
+    if prev is None or not curr.size or prev.shape != curr.shape:
         return 0.0
-    total = 0
-    for a, b in zip(prev_bytes, curr_bytes):
-        total += abs(a - b)
-    return total / (255.0 * len(curr_bytes))
-
-
-def _frame_hash(gray_bytes: bytes) -> str:
-    return hashlib.md5(gray_bytes).hexdigest()[:12]
+    if _sad_u8 is not None:
+        return _sad_u8(prev, curr) / (255.0 * curr.size)
+    if scratch is None or scratch.shape != curr.shape:
+        scratch = np.empty(curr.shape, dtype=np.int16)
+    np.subtract(curr, prev, out=scratch, dtype=np.int16)
+    np.abs(scratch, out=scratch)
+    return int(scratch.sum(dtype=np.int64)) / (255.0 * curr.size)
+
+
+def _step_reward(
+    avg_delta: float,
+    my_hp: float,
+    enemy_hp: float,
+    prev_health: Optional[Dict[str, float]],
+    *,
+    use_delta: bool,
+    delta_threshold: float,
+    delta_bonus: float,
+    idle_penalty: float,
+    deal_weight: float,
+    take_weight: float,
+) -> Tuple[float, float, float, float, float]:
+    """Per-tick reward from screen motion and HUD health changes.
+
+    Returns ``(reward, delta_reward, vision_reward, delta_enemy, delta_me)``.
+    The vision term is skipped when ``prev_health`` is None; the total is
+    clamped to +/-0.05.
+    """
+    delta_reward = 0.0
+    if use_delta:
+        delta_reward = delta_bonus if avg_delta > delta_threshold else -idle_penalty
+    vision_reward = 0.0
+    delta_enemy = 0.0
+    delta_me = 0.0
+    if prev_health is not None:
+        delta_enemy = max(0.0, prev_health["enemy"] - enemy_hp)
+        delta_me = max(0.0, prev_health["me"] - my_hp)
+        vision_reward = (deal_weight * delta_enemy) - (take_weight * delta_me)
+        if delta_enemy <= 0 and delta_me <= 0:
+            vision_reward -= idle_penalty
+    reward = max(-0.05, min(0.05, delta_reward + vision_reward))
+    return reward, delta_reward, vision_reward, delta_enemy, delta_me
+
+
+def _frame_hash(gray: np.ndarray) -> int:
+    """Content hash used only for same-frame detection.
+
+    xxh3-64 when xxhash is installed, otherwise the stdlib's CRC32; either is
+    ample for "did the frame change since the last tick".
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(gray)
+    return zlib.crc32(gray)
+
+
+def _frame_features(
+    bgra: np.ndarray,
+    prev_gray: Optional[np.ndarray],
+    prev_hash: int,
+    scratch: Optional[np.ndarray] = None,
+    target: Tuple[int, int] = (64, 36),
+) -> Tuple[np.ndarray, int, float]:
+    """Downsample, fingerprint and diff one frame: ``(gray, hash, delta)``.
+
+    ``prev_hash`` must be the hash of ``prev_gray``. The hash is taken first,
+    so an unchanged frame (menus, pauses, hit-stop) skips the SAD walk.
+    """
+    gray = _downsample_gray(bgra, target)
+    frame_hash = _frame_hash(gray)
+    if prev_gray is not None and frame_hash == prev_hash:
+        return gray, frame_hash, 0.0
+    return gray, frame_hash, _screen_delta(prev_gray, gray, scratch)
+
+
+# Health drop (fraction of a bar) that forces a screenshot off the interval.
+_SCREENSHOT_HP_SPIKE = 0.02
+# Per-tick screen delta that counts as a scene change (round start, camera
+# cut) and forces a screenshot; ordinary motion stays well below it. A bare
+# frame-hash change is not used: live frames differ on almost every tick.
+_SCREENSHOT_SCENE_DELTA = 0.2
+
+# Transitions buffered before each QLearner.update_batch call.
+_LEARNER_BATCH = 8
+
+# How often the capture thread re-reads the target window rect.
+_REGION_REFRESH_S = 1.0
+
+
+_FORCE_BUTTON_ATTRS = {
+    "DPAD_RIGHT": "XUSB_GAMEPAD_DPAD_RIGHT",
+    "DPAD_LEFT": "XUSB_GAMEPAD_DPAD_LEFT",
+    "DPAD_UP": "XUSB_GAMEPAD_DPAD_UP",
+    "DPAD_DOWN": "XUSB_GAMEPAD_DPAD_DOWN",
+    "A": "XUSB_GAMEPAD_A",
+    "B": "XUSB_GAMEPAD_B",
+    "X": "XUSB_GAMEPAD_X",
+    "Y": "XUSB_GAMEPAD_Y",
+    "START": "XUSB_GAMEPAD_START",
+    "BACK": "XUSB_GAMEPAD_BACK",
+    "LB": "XUSB_GAMEPAD_LEFT_SHOULDER",
+    "RB": "XUSB_GAMEPAD_RIGHT_SHOULDER",
+    "LTHUMB": "XUSB_GAMEPAD_LEFT_THUMB",
+    "RTHUMB": "XUSB_GAMEPAD_RIGHT_THUMB",
+}
+# Resolved once at import; names missing from this vgamepad build are skipped.
+_FORCE_BUTTONS: Dict[str, vg.XUSB_BUTTON] = {
+    key: getattr(vg.XUSB_BUTTON, attr)
+    for key, attr in _FORCE_BUTTON_ATTRS.items()
+    if hasattr(vg.XUSB_BUTTON, attr)
+}
 
 
 def _resolve_force_button(name: str | None) -> vg.XUSB_BUTTON | None:
     if not name:
         return None
-    key = name.strip().upper()
-    mapping = {
-        "DPAD_RIGHT": "XUSB_GAMEPAD_DPAD_RIGHT",
-        "DPAD_LEFT": "XUSB_GAMEPAD_DPAD_LEFT",
-        "DPAD_UP": "XUSB_GAMEPAD_DPAD_UP",
-        "DPAD_DOWN": "XUSB_GAMEPAD_DPAD_DOWN",
-        "A": "XUSB_GAMEPAD_A",
-        "B": "XUSB_GAMEPAD_B",
-        "X": "XUSB_GAMEPAD_X",
-        "Y": "XUSB_GAMEPAD_Y",
-        "START": "XUSB_GAMEPAD_START",
-        "BACK": "XUSB_GAMEPAD_BACK",
-        "LB": "XUSB_GAMEPAD_LEFT_SHOULDER",
-        "RB": "XUSB_GAMEPAD_RIGHT_SHOULDER",
-        "LTHUMB": "XUSB_GAMEPAD_LEFT_THUMB",
-        "RTHUMB": "XUSB_GAMEPAD_RIGHT_THUMB",
-    }
-    attr = mapping.get(key)
-    if not attr:
-        return None
-    return getattr(vg.XUSB_BUTTON, attr, None)
+    return _FORCE_BUTTONS.get(name.strip().upper())
 
 
 def _tap_button(gamepad: vg.VX360Gamepad, button: vg.XUSB_BUTTON, *, hold_seconds: float = 0.08) -> None:
@@ -414,6 +676,7 @@ def main() -> int:
         hud_debug_dir.mkdir(parents=True, exist_ok=True)
     transitions_path = run_root / "transitions.jsonl"
     summaries_path = run_root / "episode_summaries.json"
+    summaries_log_path = run_root / "episode_summaries.jsonl"
     video_recorder: VideoRecorder | None = None
     if args.record_video:
         if imageio is None:
@@ -464,6 +727,18 @@ def main() -> int:
     force_button = _resolve_force_button(args.force_action)
     if args.force_action and force_button is None:
         raise SystemExit(f"Unknown --force-action '{args.force_action}'.")
+    if screenshots_dir and args.screenshot_format != "png" and Image is None:
+        raise SystemExit(
+            f"--screenshot-format {args.screenshot_format} requires Pillow. "
+            "Run 'pip install Pillow' or pass --screenshot-format png"
+        )
+    if args.debug_hud and Image is None:
+        raise SystemExit("--debug-hud requires Pillow. Run 'pip install Pillow'")
+    force_action_name = args.force_action.strip().upper() if args.force_action else ""
+    force_log_every = max(1, int(args.decision_hz))
+    decision_period = 1.0 / args.decision_hz
+    # A few ticks without a frame means the capture thread is stuck.
+    capture_timeout = max(0.5, 5 * decision_period)
 
     lock = lock_target(
         mode="exe",
@@ -519,7 +794,8 @@ def main() -> int:
                 P2_HEALTH_N,
                 P1_BAR_POLY_NORM,
                 P2_BAR_POLY_NORM,
-                estimate_health_poly,
+                build_poly_mask,
+                estimate_health_poly_px,
                 norm_poly_to_px,
             )
 
@@ -534,6 +810,9 @@ def main() -> int:
         except Exception as exc:
             raise SystemExit(f"Health bar extraction unavailable: {exc}")
     legal_actions = action_names()
+    action_table = {action.name: action for action in ACTIONS}
+    delta_rewarded = args.reward_mode in {"delta", "both"}
+    vision_rewarded = tracker is not None and args.reward_mode in {"vision", "both"}
     episode_summaries = []
     stop_requested = False
 
@@ -544,13 +823,77 @@ def main() -> int:
     signal.signal(signal.SIGINT, _handle_stop)
     signal.signal(signal.SIGTERM, _handle_stop)
 
+    cached_region: Optional[Tuple[dict, dict]] = None
+    cached_region_at = 0.0
+
+    def _grab_region(screen) -> Tuple[dict, dict]:
+        # Runs on the capture thread; SystemExit is re-raised by grabber.get().
+        # The window rarely moves, so the Win32 rect lookup is polled at
+        # _REGION_REFRESH_S instead of on every grab.
+        nonlocal cached_region, cached_region_at
+        now = time.perf_counter()
+        if cached_region is None or now - cached_region_at >= _REGION_REFRESH_S:
+            cached_region = _resolve_grab_region(screen)
+            cached_region_at = now
+        return cached_region
+
+    def _resolve_grab_region(screen) -> Tuple[dict, dict]:
+        capture_region, rect_info = _capture_region_for_target(
+            target_hwnd, args.capture_mode
+        )
+        if args.capture_mode == "window":
+            if not capture_region:
+                raise SystemExit(
+                    "WINDOW CAPTURE FAILED: no client/window rect. "
+                    "Ensure SF6 is visible and not minimized."
+                )
+            if capture_region.get("width", 0) <= 0 or capture_region.get("height", 0) <= 0:
+                raise SystemExit(
+                    "WINDOW CAPTURE FAILED: invalid client/window rect. "
+                    "Ensure SF6 is visible and not minimized."
+                )
+            return capture_region, rect_info
+        return screen.monitors[0], rect_info
+
+    # PNG encoding and disk writes happen on a worker thread, off the tick.
+    screenshot_writer = BackgroundScreenshotWriter()
+    # One buffered handle for the whole run; flushed at each episode end.
+    transitions_fh = transitions_path.open("ab", buffering=1 << 20)
+    policy_saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-save")
+    checkpoint_every = max(1, args.checkpoint_every)
+    policy_dirty = False
+    policy_written = False
+
+    def _report_policy_save(future) -> None:
+        nonlocal policy_written
+        exc = future.exception()
+        if exc is not None:
+            print(f"POLICY_SAVE_FAILED={exc}")
+        else:
+            policy_written = True
+
+    roi_diag_px = None
+    roi_diag_mode = roi_mode
+    roi_diag_offset_px = None
+
     try:
-        with mss.mss() as screen:  # type: ignore[attr-defined]
-            monitor = screen.monitors[0]
+        # Capture runs one stage ahead on its own thread; vision, reward and
+        # learning stay on this thread with the gamepad.
+        with BackgroundGrabber(region_fn=_grab_region) as grabber:
+            delta_scratch = np.empty(64 * 36, dtype=np.int16)
+            # Smoothed delta per tick, sized for a full episode at decision_hz.
+            episode_deltas = np.empty(
+                int(args.episode_seconds * args.decision_hz) + 8, dtype=np.float64
+            )
+            _warm_frame_kernels((64, 36))
             diagnostics_printed = False
-            roi_diag_px = None
-            roi_diag_mode = roi_mode
-            roi_diag_offset_px = None
+            poly_masks_key: Optional[Tuple[int, int, int]] = None
+            p1_mask = p2_mask = None
+            # Tick-loop hot names bound once (LOAD_FAST instead of global+attr).
+            perf_counter = time.perf_counter
+            sleep = time.sleep
+            time_ns = time.time_ns
+            select_action = learner.select_action
             for episode_idx in range(args.episodes):
                 if stop_requested:
                     break
@@ -565,37 +908,40 @@ def main() -> int:
                 action_started = True
                 episode_health_start = None
                 episode_health_end = None
-                prev_gray = b""
+                prev_gray: Optional[np.ndarray] = None
                 delta_window: Deque[float] = deque(maxlen=max(1, args.delta_window))
-                avg_screen_delta = 0.0
-                delta_gt_count = 0
-                frame_hash_prev = ""
+                delta_window_sum = 0.0
+                frame_hash_prev = 0
                 same_state_streak = 0
+                tick_overruns = 0
+                learner_batch: List[Tuple[str, str, float, str]] = []
+                # Formatted per keyframe instead of joining Paths in the tick.
+                screenshot_tmpl = (
+                    f"{screenshots_dir}{os.sep}ep{episode_idx:03d}_step{{:05d}}"
+                    f".{args.screenshot_format}"
+                    if screenshots_dir
+                    else ""
+                )
+                grabber.drain()
 
-                while time.perf_counter() < episode_end:
+                # Absolute deadlines: a slow tick doesn't shift later ones.
+                next_deadline = perf_counter()
+                while perf_counter() < episode_end:
                     if stop_requested:
                         break
-                    now = time.perf_counter()
+                    now = perf_counter()
                     t_run = now - episode_start
-                    capture_region, rect_info = _capture_region_for_target(
-                        target_hwnd, args.capture_mode
-                    )
-                    if args.capture_mode == "window":
-                        if not capture_region:
-                            raise SystemExit(
-                                "WINDOW CAPTURE FAILED: no client/window rect. "
-                                "Ensure SF6 is visible and not minimized."
-                            )
-                        if capture_region.get("width", 0) <= 0 or capture_region.get("height", 0) <= 0:
-                            raise SystemExit(
-                                "WINDOW CAPTURE FAILED: invalid client/window rect. "
-                                "Ensure SF6 is visible and not minimized."
-                            )
-                        shot = screen.grab(capture_region)
-                    else:
-                        shot = screen.grab(monitor)
-                    width, height = shot.size
-                    frame = shot.rgb
+                    try:
+                        shot = grabber.get(timeout=capture_timeout)
+                    except queue.Empty:
+                        raise SystemExit(
+                            f"Screen capture stalled for {capture_timeout:.2f}s; aborting."
+                        ) from None
+                    width, height = shot.width, shot.height
+                    # RGB bytes are only materialized (once) for screenshots/video.
+                    frame_raw = shot.raw
+                    rect_info = shot.rect_info
+                    monitor = shot.monitor
 
                     if not diagnostics_printed:
                         diagnostics_printed = True
@@ -616,18 +962,8 @@ def main() -> int:
                             roi_diag_offset_px = offset_px
                             print(f"ROI_MODE={roi_mode}")
                             if roi_mode == "rect" and p1_roi_norm and p2_roi_norm:
-                                p1_px = (
-                                    int(p1_roi_norm[0] * width),
-                                    int(p1_roi_norm[1] * height),
-                                    int(p1_roi_norm[2] * width),
-                                    int(p1_roi_norm[3] * height),
-                                )
-                                p2_px = (
-                                    int(p2_roi_norm[0] * width),
-                                    int(p2_roi_norm[1] * height),
-                                    int(p2_roi_norm[2] * width),
-                                    int(p2_roi_norm[3] * height),
-                                )
+                                p1_px = _roi_px(p1_roi_norm, width, height)
+                                p2_px = _roi_px(p2_roi_norm, width, height)
                                 print(f"P1_ROI_PX_PRE={p1_px}")
                                 print(f"P2_ROI_PX_PRE={p2_px}")
                                 p1_post = _apply_y_offset(p1_px, frame_h=height, offset_px=offset_px)
@@ -649,27 +985,26 @@ def main() -> int:
                                 print(f"P2_POLY_PX={p2_list}")
                                 roi_diag_px = {"p1": p1_list, "p2": p2_list}
 
-                    screenshot_path_str = ""
-                    if screenshots_dir and screenshot_interval and (step_idx % screenshot_interval == 0):
-                        screenshot_path = screenshots_dir / f"ep{episode_idx:03d}_step{step_idx:05d}.png"
-                        _save_screenshot(frame, (width, height), screenshot_path)
-                        screenshot_path_str = str(screenshot_path)
                     if video_recorder:
                         try:
-                            video_recorder.append(frame, width, height)
+                            video_recorder.append(shot.rgb, width, height)
                         except Exception as exc:
                             print(f"VIDEO_RECORDING_FAILED={exc}")
                             video_recorder = None
 
-                    gray_small = _downsample_gray_bytes(frame, (width, height), (64, 36))
-                    delta = _screen_delta(prev_gray, gray_small)
+                    gray_small, frame_hash, delta = _frame_features(
+                        shot.bgra, prev_gray, frame_hash_prev, delta_scratch
+                    )
+                    # Running sum keeps the rolling mean O(1) for any window size.
+                    if len(delta_window) == delta_window.maxlen:
+                        delta_window_sum -= delta_window[0]
                     delta_window.append(delta)
-                    avg_delta = sum(delta_window) / len(delta_window)
-                    avg_screen_delta += avg_delta
-                    if avg_delta > args.delta_threshold:
-                        delta_gt_count += 1
+                    delta_window_sum += delta
+                    avg_delta = delta_window_sum / len(delta_window)
+                    if step_idx >= episode_deltas.shape[0]:
+                        episode_deltas = np.resize(episode_deltas, 2 * episode_deltas.shape[0])
+                    episode_deltas[step_idx] = avg_delta
                     prev_gray = gray_small
-                    frame_hash = _frame_hash(gray_small)
                     if frame_hash == frame_hash_prev:
                         same_state_streak += 1
                     else:
@@ -680,36 +1015,33 @@ def main() -> int:
                     enemy_hp = 1.0
                     debug_snapshot = args.debug_hud and step_idx in {0, 2, 4}
                     image = None
-                    if tracker is not None or debug_snapshot:
-                        from PIL import Image  # type: ignore
-                        from PIL import ImageDraw  # type: ignore
-
-                        image = Image.frombytes("RGB", (width, height), frame)
+                    if debug_snapshot:
+                        image = Image.frombytes("RGB", (width, height), frame_raw, "raw", "BGRX")
                     if tracker is not None:
+                        # RGB view of the BGRA capture (no copy); HUD readers
+                        # slice their ROIs out of it directly.
+                        frame_rgb = shot.bgra[..., 2::-1]
                         offset_px = args.hud_y_offset_px
                         if args.hud_y_offset_norm is not None:
                             offset_px = int(args.hud_y_offset_norm * height)
                         if roi_mode == "poly" and p1_poly_norm and p2_poly_norm:
-                            my_hp = estimate_health_poly(
-                                image,
-                                p1_poly_norm,
-                                y_offset_px=offset_px,
-                            )
-                            enemy_hp = estimate_health_poly(
-                                image,
-                                p2_poly_norm,
-                                y_offset_px=offset_px,
-                            )
+                            # Rasterize the HUD polygons once per frame size/offset.
+                            if (width, height, offset_px) != poly_masks_key:
+                                p1_mask = build_poly_mask(
+                                    p1_poly_norm, width, height, y_offset_px=offset_px
+                                )
+                                p2_mask = build_poly_mask(
+                                    p2_poly_norm, width, height, y_offset_px=offset_px
+                                )
+                                poly_masks_key = (width, height, offset_px)
+                            my_hp = estimate_health_poly_px(frame_rgb, p1_mask)
+                            enemy_hp = estimate_health_poly_px(frame_rgb, p2_mask)
                         else:
                             if args.hud_y_offset_px or args.hud_y_offset_norm is not None:
-                                shifted = image.transform(
-                                    image.size,
-                                    Image.AFFINE,
-                                    (1, 0, 0, 0, 1, -offset_px),
-                                )
+                                shifted = _shift_rows(frame_rgb, offset_px)
                                 my_hp, enemy_hp = tracker.update(shifted)
                             else:
-                                my_hp, enemy_hp = tracker.update(image)
+                                my_hp, enemy_hp = tracker.update(frame_rgb)
                         offset_px = args.hud_y_offset_px
                         if args.hud_y_offset_norm is not None:
                             offset_px = int(args.hud_y_offset_norm * height)
@@ -731,20 +1063,8 @@ def main() -> int:
                                 if p2_pts:
                                     draw.line(p2_pts + [p2_pts[0]], fill="red", width=2)
                             else:
-                                p1 = tracker.p1_roi
-                                p2 = tracker.p2_roi
-                                p1_px = (
-                                    int(p1[0] * width),
-                                    int(p1[1] * height),
-                                    int(p1[2] * width),
-                                    int(p1[3] * height),
-                                )
-                                p2_px = (
-                                    int(p2[0] * width),
-                                    int(p2[1] * height),
-                                    int(p2[2] * width),
-                                    int(p2[3] * height),
-                                )
+                                p1_px = _roi_px(tracker.p1_roi, width, height)
+                                p2_px = _roi_px(tracker.p2_roi, width, height)
                                 p1_px = _apply_y_offset(p1_px, frame_h=height, offset_px=offset_px)
                                 p2_px = _apply_y_offset(p2_px, frame_h=height, offset_px=offset_px)
                                 draw.rectangle(p1_px, outline="red", width=2)
@@ -759,43 +1079,55 @@ def main() -> int:
                     if episode_health_start is None:
                         episode_health_start = (my_hp, enemy_hp)
 
-                    reward = 0.0
-                    delta_enemy = 0.0
-                    delta_me = 0.0
-                    vision_reward = 0.0
-                    delta_reward = 0.0
-                    if args.reward_mode in {"delta", "both"}:
-                        if avg_delta > args.delta_threshold:
-                            delta_reward = args.delta_reward
-                        else:
-                            delta_reward = -args.idle_penalty
-                    if prev_health is not None and tracker is not None and args.reward_mode in {"vision", "both"}:
-                        delta_enemy = max(0.0, prev_health["enemy"] - enemy_hp)
-                        delta_me = max(0.0, prev_health["me"] - my_hp)
-                        vision_reward = (args.deal_weight * delta_enemy) - (
-                            args.take_weight * delta_me
+                    reward, delta_reward, vision_reward, delta_enemy, delta_me = _step_reward(
+                        avg_delta,
+                        my_hp,
+                        enemy_hp,
+                        prev_health if vision_rewarded else None,
+                        use_delta=delta_rewarded,
+                        delta_threshold=args.delta_threshold,
+                        delta_bonus=args.delta_reward,
+                        idle_penalty=args.idle_penalty,
+                        deal_weight=args.deal_weight,
+                        take_weight=args.take_weight,
+                    )
+
+                    # Keyframes only: every Nth step, plus any tick where the
+                    # scene cut or either health bar dropped noticeably.
+                    # The drops come from the tracked health directly: the
+                    # reward's delta_me/delta_enemy stay 0 outside vision mode.
+                    screenshot_path_str = None
+                    if screenshots_dir and screenshot_interval and (
+                        step_idx % screenshot_interval == 0
+                        or delta > _SCREENSHOT_SCENE_DELTA
+                        or (
+                            prev_health is not None
+                            and (
+                                prev_health["me"] - my_hp > _SCREENSHOT_HP_SPIKE
+                                or prev_health["enemy"] - enemy_hp > _SCREENSHOT_HP_SPIKE
+                            )
+                        )
+                    ):
+                        screenshot_path_str = screenshot_tmpl.format(step_idx)
+                        screenshot_writer.submit(
+                            shot.rgb, (width, height), Path(screenshot_path_str)
                         )
-                        if delta_enemy <= 0 and delta_me <= 0:
-                            vision_reward -= args.idle_penalty
-                    if args.reward_mode == "delta":
-                        reward = delta_reward
-                    elif args.reward_mode == "vision":
-                        reward = vision_reward
-                    else:
-                        reward = delta_reward + vision_reward
-                    reward = max(-0.05, min(0.05, reward))
 
-                    state = make_state(my_hp, enemy_hp, t_run, prev_action, args.episode_seconds)
+                    # State and next_state differ only in the action, so the
+                    # buckets are computed once per tick.
+                    buckets = state_buckets(my_hp, enemy_hp, t_run, args.episode_seconds)
+                    state = state_key(buckets, prev_action)
+                    time_bucket = buckets[2]
 
                     if force_button is not None:
-                        action_name = args.force_action.strip().upper()
+                        action_name = force_action_name
                         if not args.dry_run:
                             gamepad.press_button(button=force_button)
                             gamepad.update()
                             time.sleep(0.1)
                             gamepad.release_button(button=force_button)
                             gamepad.update()
-                        if step_idx % max(1, int(args.decision_hz)) == 0:
+                        if step_idx % force_log_every == 0:
                             print(f"FORCE_ACTION={action_name} step={step_idx}")
                     else:
                         if hold_remaining <= 0:
@@ -806,33 +1138,36 @@ def main() -> int:
                                     script_index = (script_index + 1) % len(action_script)
                                     script_remaining = action_script[script_index][1]
                             else:
-                                action_name = learner.select_action(state, legal_actions)
-                            current_action = get_action(action_name)
+                                action_name = select_action(state, legal_actions)
+                            current_action = action_table[action_name]
                             hold_remaining = args.action_hold_ticks
                             action_started = True
                         else:
                             action_name = current_action.name
                             action_started = False
 
-                        if not args.dry_run:
-                            if current_action.tap and action_started:
-                                apply_action(gamepad, current_action)
-                                release_all(gamepad)
-                            elif current_action.tap:
+                        # The virtual pad holds its last report, so only the
+                        # tick that starts an action sends anything; taps are
+                        # released immediately and held actions stay pressed.
+                        if action_started and not args.dry_run:
+                            apply_action(gamepad, current_action)
+                            if current_action.tap:
                                 release_all(gamepad)
-                            else:
-                                apply_action(gamepad, current_action)
 
-                    next_state = make_state(my_hp, enemy_hp, t_run, action_name, args.episode_seconds)
+                    next_state = state_key(buckets, action_name)
                     if force_button is None:
-                        learner.update(state, action_name, reward, next_state, legal_actions)
+                        learner_batch.append((state, action_name, reward, next_state))
+                        if len(learner_batch) >= _LEARNER_BATCH:
+                            learner.update_batch(learner_batch, legal_actions)
+                            learner_batch.clear()
+                            policy_dirty = True
 
                     record = {
-                        "ts_utc": datetime.now(timezone.utc).isoformat(),
+                        "ts_utc": _utc_iso(time_ns()),
                         "episode_idx": episode_idx,
                         "step_idx": step_idx,
                         "t_run_s": t_run,
-                        "screenshot_path": screenshot_path_str or None,
+                        "screenshot_path": screenshot_path_str,
                         "my_hp": my_hp,
                         "enemy_hp": enemy_hp,
                         "reward": reward,
@@ -842,15 +1177,14 @@ def main() -> int:
                         "reward_delta_component": delta_reward,
                         "reward_vision_component": vision_reward,
                         "delta_threshold": args.delta_threshold,
-                        "frame_hash": frame_hash,
+                        "frame_hash": f"{frame_hash:016x}",
                         "same_state_streak": same_state_streak,
                         "state": state,
                         "action": action_name,
                         "epsilon": learner.epsilon,
-                        "time_bucket": json.loads(state)["time"],
+                        "time_bucket": time_bucket,
                     }
-                    with transitions_path.open("a", encoding="utf-8") as handle:
-                        handle.write(json.dumps(record) + "\n")
+                    transitions_fh.write(_jsonl_line(record))
 
                     if prev_health is not None:
                         total_reward += reward
@@ -860,14 +1194,41 @@ def main() -> int:
                     step_idx += 1
                     hold_remaining -= 1
 
-                    sleep_s = max(0.0, (1.0 / args.decision_hz) - (time.perf_counter() - now))
-                    if sleep_s > 0:
-                        time.sleep(sleep_s)
+                    next_deadline += decision_period
+                    slack = next_deadline - perf_counter()
+                    if slack > 0:
+                        # Start the next grab so it lands right at the deadline:
+                        # fresh, and its cost hidden in the slack.
+                        lead = slack - grabber.grab_seconds
+                        if lead > 0:
+                            sleep(lead)
+                        grabber.request()
+                        remaining = next_deadline - perf_counter()
+                        if remaining > 0:
+                            sleep(remaining)
+                    else:
+                        # Over budget: skip ahead rather than accumulate debt.
+                        tick_overruns += 1
+                        if tick_overruns == 1 or tick_overruns % force_log_every == 0:
+                            print(
+                                f"TICK_OVERRUN ms={-slack * 1000.0:.1f} "
+                                f"step={step_idx} count={tick_overruns}"
+                            )
+                        next_deadline = perf_counter()
 
+                if learner_batch:
+                    learner.update_batch(learner_batch, legal_actions)
+                    learner_batch.clear()
+                    policy_dirty = True
                 if episode_health_start is None:
                     episode_health_start = (1.0, 1.0)
                 episode_health_end = prev_health or {"me": 1.0, "enemy": 1.0}
-                avg_screen_delta = avg_screen_delta / max(1, step_idx)
+                # Episode stats in one vectorized pass over the per-tick deltas.
+                deltas = episode_deltas[:step_idx]
+                avg_screen_delta = float(deltas.mean()) if step_idx else 0.0
+                pct_delta_gt = (
+                    float((deltas > args.delta_threshold).mean()) * 100.0 if step_idx else 0.0
+                )
                 advantage = net_advantage(
                     enemy_start=episode_health_start[1],
                     enemy_end=episode_health_end["enemy"],
@@ -879,30 +1240,51 @@ def main() -> int:
                     "total_reward": total_reward,
                     "net_advantage": advantage,
                     "steps": step_idx,
+                    "tick_overruns": tick_overruns,
                     "p1_start": episode_health_start[0],
                     "p2_start": episode_health_start[1],
                     "p1_end": episode_health_end["me"],
                     "p2_end": episode_health_end["enemy"],
                     "avg_screen_delta": avg_screen_delta,
-                    "pct_delta_gt_threshold": (delta_gt_count / max(1, step_idx)) * 100.0,
+                    "pct_delta_gt_threshold": pct_delta_gt,
                 }
+                transitions_fh.flush()
                 episode_summaries.append(summary)
-                payload = {"episodes": episode_summaries}
-                if roi_diag_mode:
-                    payload["roi_mode"] = roi_diag_mode
-                if roi_diag_px is not None:
-                    payload["roi_px"] = roi_diag_px
-                if roi_diag_offset_px is not None:
-                    payload["hud_y_offset_px"] = roi_diag_offset_px
-                summaries_path.write_text(
-                    json.dumps(payload, indent=2),
-                    encoding="utf-8",
-                )
-                learner.save(policy_path)
+                # Crash-safe checkpoint: one line per episode. The indented
+                # summary file is written once, in the finally block below.
+                with summaries_log_path.open("ab") as summaries_fh:
+                    summaries_fh.write(_jsonl_line(summary))
+                # Serialize a detached copy off-thread so the next episode
+                # starts immediately; the single worker keeps saves ordered.
+                if policy_dirty and (episode_idx + 1) % checkpoint_every == 0:
+                    policy_saver.submit(
+                        write_policy, learner.snapshot(), policy_path
+                    ).add_done_callback(_report_policy_save)
+                    policy_dirty = False
                 if args.tap_select_between_episodes and not stop_requested:
                     _tap_select(gamepad)
                     print("TAPPED_SELECT_RESET=1")
     finally:
+        transitions_fh.close()
+        policy_saver.shutdown(wait=True)
+        if policy_dirty:
+            # Final checkpoint for whatever the periodic saves haven't covered.
+            try:
+                learner.save(policy_path)
+                policy_written = True
+            except Exception as exc:
+                print(f"POLICY_SAVE_FAILED={exc}")
+        try:
+            payload = {"episodes": episode_summaries}
+            if roi_diag_mode:
+                payload["roi_mode"] = roi_diag_mode
+            if roi_diag_px is not None:
+                payload["roi_px"] = roi_diag_px
+            if roi_diag_offset_px is not None:
+                payload["hud_y_offset_px"] = roi_diag_offset_px
+            summaries_path.write_bytes(_json_pretty(payload))
+        except Exception as exc:
+            print(f"SUMMARIES_WRITE_FAILED={exc}")
         try:
             release_all(gamepad)
             if not args.dry_run:
@@ -910,6 +1292,10 @@ def main() -> int:
                 release_all(gamepad)
         except Exception:
             pass
+        try:
+            screenshot_writer.close()
+        except Exception:
+            pass
         try:
             if video_recorder:
                 video_recorder.close()
@@ -928,7 +1314,8 @@ def main() -> int:
         output_path=report_path,
     )
     print(f"RUN_DIR={run_root.resolve()}")
-    print(f"WROTE_POLICY={policy_path.resolve()}")
+    # Force-action runs and runs without updates never save a policy.
+    print(f"WROTE_POLICY={policy_path.resolve() if policy_written else 'skipped'}")
     print(f"WROTE_REPORT={report_path.resolve()}")
     if video_recorder and video_recorder.frame_count > 0:
         print(f"WROTE_VIDEO={video_recorder.output_path.resolve()}")
@@ -39,6 +39,13 @@ def _before_request():
     _hydrate_roles()
 
 
+def _database_url() -> str:
+    url = current_app.extensions.get("_db_url")
+    if url is None:  # blueprint mounted on an app not built by create_app()
+        url = current_app.config["DATABASE_URL"]
+    return url
+
+
 def _episode_actor() -> str:
     api_key = getattr(g, "current_api_key", None)
     if not api_key:
@@ -71,13 +78,28 @@ def _parse_offset(value: str | None) -> int:
     return parsed
 
 
-def _episode_filters() -> Dict[str, str]:
+def _parse_after_id(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError("after_id must be an integer") from exc
+    if parsed < 1:
+        raise ValueError("after_id must be >= 1")
+    return parsed
+
+
+def _episode_filters() -> Dict[str, str] | None:
+    args = request.args
+    if not args:
+        return None
     filters: Dict[str, str] = {}
     for field in ("project", "status", "mode"):
-        value = request.args.get(field)
+        value = args.get(field)
         if value:
             filters[field] = value
-    return filters
+    return filters or None
 
 
 @bp.get("/")
@@ -137,7 +159,7 @@ def api_triage() -> Dict[str, Any]:
 @json_endpoint
 def create_episode() -> tuple[Dict[str, Any], int]:
     payload = request.get_json(silent=True) or {}
-    database_url = current_app.config["DATABASE_URL"]
+    database_url = _database_url()
     created_by = _episode_actor()
     episode_id = episodes.create_episode(database_url, payload, created_by)
     return {"ok": True, "episode_id": episode_id}, 201
@@ -148,14 +170,26 @@ def create_episode() -> tuple[Dict[str, Any], int]:
 @require_api_key
 @json_endpoint
 def list_episodes() -> Dict[str, Any]:
-    database_url = current_app.config["DATABASE_URL"]
+    database_url = _database_url()
     limit = _parse_limit(request.args.get("limit"))
     offset = _parse_offset(request.args.get("offset"))
-    filters = _episode_filters()
+    # Keyset cursor; preferred over offset for paging deep into the list.
+    after_id = _parse_after_id(request.args.get("after_id"))
     records = episodes.list_episodes(
-        database_url, limit=limit, offset=offset, filters=filters or None
+        database_url,
+        limit=limit,
+        offset=offset,
+        filters=_episode_filters(),
+        after_id=after_id,
     )
-    return {"episodes": records, "limit": limit, "offset": offset}
+    # A short page is the last one, so no cursor is handed back.
+    next_after_id = records[-1]["id"] if len(records) == limit else None
+    return {
+        "episodes": records,
+        "limit": limit,
+        "offset": offset,
+        "next_after_id": next_after_id,
+    }
 
 
 @bp.get("/api/episodes/<int:episode_id>")
@@ -163,7 +197,7 @@ def list_episodes() -> Dict[str, Any]:
 @require_api_key
 @json_endpoint
 def get_episode(episode_id: int) -> tuple[Dict[str, Any], int] | Dict[str, Any]:
-    database_url = current_app.config["DATABASE_URL"]
+    database_url = _database_url()
     record = episodes.get_episode(database_url, episode_id)
     if not record:
         return {"error": "Episode not found"}, 404
@@ -174,7 +208,7 @@ def get_episode(episode_id: int) -> tuple[Dict[str, Any], int] | Dict[str, Any]:
 @require_role("admin")
 @json_endpoint
 def brain_rollback(version_id: int) -> Dict[str, Any]:
-    database_url = current_app.config["DATABASE_URL"]
+    database_url = _database_url()
     version = brain.rollback_to_version(database_url, version_id)
     actor = request.headers.get("X-API-Key", "system")
     AUDIT_LOG.record(event=f"Rollback to brain version {version_id}", actor=actor)